@@ -0,0 +1,91 @@
+import time
+import random
+import argparse
+from typing import List, Sequence
+
+from hardware.ads7142 import ADC_CODES, ADS7142, INVALID_READING, code_table
+
+
+def decode_loop(read_data: Sequence[int]) -> List[float]:
+    data = ADS7142.bytes_to_int16(read_data)
+    data_mC = [0, 0]
+    counter = [0, 0]
+    accumulate_mC = [0, 0]
+
+    for val in data:
+        if val & 0x0001:
+            idx = 1 if val & 0b1110 else 0
+            counter[idx] += 1
+            accumulate_mC[idx] += ADS7142.calculate_temp((val & 0xFFF0) >> 4)
+
+    for idx in range(2):
+        if counter[idx] != 0:
+            accumulate_mC[idx] /= counter[idx]
+            data_mC[idx] = accumulate_mC[idx]
+        else:
+            data_mC[idx] = INVALID_READING
+    return [each/10 for each in data_mC]
+
+
+def random_block(rng: random.Random) -> List[int]:
+    block = []
+    for _ in range(16):
+        val = (rng.randrange(4096) << 4) | (rng.choice((0b0000, 0b0010)) if rng.random() < 0.9 else 0) | (rng.random() < 0.9)
+        block += [val >> 8, val & 0xFF]
+    return block
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    lut = code_table()
+    for code in range(ADC_CODES):
+        assert lut[code] == ADS7142.calculate_temp(code), code
+    print(f"{ADC_CODES} lookup table codes match calculate_temp bit for bit")
+
+    rng = random.Random(0)
+    blocks = [random_block(rng) for _ in range(args.blocks)]
+    blocks.append([0] * 32)
+
+    batched, _ = ADS7142.decode_thermistor_blocks(blocks)
+    for block, row in zip(blocks, batched.tolist()):
+        expected = decode_loop(block)
+        actual, _ = ADS7142.decode_thermistor_block(block)
+        assert actual == expected, (block, expected, actual)
+        assert row == expected, (block, expected, row)
+    print(f"{len(blocks)} blocks decode identically")
+
+    def batches(size: int):
+        return lambda: [ADS7142.decode_thermistor_blocks(blocks[i:i + size]) for i in range(0, len(blocks), size)]
+
+    for name, fn in (
+        ("interpolate", lambda: [ADS7142.calculate_temp(code) for code in range(ADC_CODES)]),
+        ("lookup table", lambda: [lut[code] for code in range(ADC_CODES)]),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>16}: {1e9 * best / ADC_CODES:7.1f} ns/code")
+
+    for name, fn in (
+        ("per-sample loop", lambda: [decode_loop(block) for block in blocks]),
+        ("one-shot unpack", lambda: [ADS7142.decode_thermistor_block(block) for block in blocks]),
+        ("batch of 8", batches(8)),
+        ("batch of 32", batches(32)),
+        ("batch of 128", batches(128)),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>16}: {1e6 * best / len(blocks):7.2f} us/block")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import time
+import argparse
+
+from app_ipc.codec import JSON, MSGPACK, get_codec, pack_message, unpack_message
+from app_ipc.payloads import RepPayload
+
+
+def get_temps_reply() -> RepPayload:
+    return RepPayload(
+        status="ok",
+        payload={f"channel_{n}": [80.0 + n / 7, 80.5 + n / 11] for n in range(1, 9)},
+    )
+
+
+def timed(callback, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        callback()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--codec", nargs="+", default=[JSON, MSGPACK])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    reply = get_temps_reply()
+    for name in args.codec:
+        codec = get_codec(name)
+        frames = pack_message(name, reply)
+        assert unpack_message(frames)[1] == reply
+
+        message = codec.encode(reply)
+        encode_s = timed(lambda: pack_message(name, reply), args.iterations)
+        decode_s = timed(lambda: unpack_message(frames), args.iterations)
+        print(
+            f"{name:>8}: {len(message):4d} bytes, "
+            f"encode {encode_s * 1e6:6.2f} us, "
+            f"decode {decode_s * 1e6:6.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import time
+import datetime
+import argparse
+import pandas as pd
+
+from data.dataframes import Frame
+from data.units import DataPoint
+
+
+HEADERS = ["timestamp", "therm_L_C", "therm_R_C", "duty_cycle", "cycle"]
+
+
+def sample(i: int) -> DataPoint:
+    return DataPoint(datetime.datetime.now(), 60.0 + i % 7, 61.0 + i % 5, i % 100, 3)
+
+
+def bench_frame(rows: int, window: int) -> None:
+    frame = Frame("bench", HEADERS, "/tmp/")
+    print(f"Frame.add_row, {rows} rows, per-row cost per {window} row window")
+    start = time.perf_counter()
+    for i in range(rows):
+        frame.add_row(sample(i))
+        if (i + 1) % window == 0:
+            now = time.perf_counter()
+            print(f"  rows {i + 1 - window:>8}-{i + 1:<8} {1e6 * (now - start) / window:8.3f} us/row")
+            start = now
+    start = time.perf_counter()
+    frame.to_dataframe()
+    print(f"  materialize {rows} rows: {1e3 * (time.perf_counter() - start):.1f} ms")
+
+
+def bench_concat(rows: int, window: int) -> None:
+    df = pd.DataFrame(columns=HEADERS)
+    print(f"pd.concat baseline, {rows} rows, per-row cost per {window} row window")
+    start = time.perf_counter()
+    for i in range(rows):
+        df = pd.concat([df, pd.DataFrame([sample(i)._asdict()])], axis=0, ignore_index=True)
+        if (i + 1) % window == 0:
+            now = time.perf_counter()
+            print(f"  rows {i + 1 - window:>8}-{i + 1:<8} {1e6 * (now - start) / window:8.3f} us/row")
+            start = now
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10**6)
+    parser.add_argument("--window", type=int, default=10**5)
+    parser.add_argument("--baseline-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    bench_frame(args.rows, args.window)
+    if args.baseline_rows:
+        bench_concat(args.baseline_rows, max(1, args.baseline_rows // 5))
+
+
+if __name__ == "__main__":
+    main()
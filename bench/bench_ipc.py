@@ -0,0 +1,103 @@
+import time
+import argparse
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from app_ipc.client import Client
+from app_ipc.payloads import RepPayload
+from app_ipc.server import RouterServer, Server
+
+
+class FakeApplication:
+    def __init__(self, control_s: float) -> None:
+        self.control_s = control_s
+
+    def get_temps(self, channel: str) -> RepPayload:
+        return RepPayload(status="ok", payload={f"channel_{n}": [80.0, 80.5] for n in range(1, 9)})
+
+    def get_duty_cycle(self, channel: str) -> RepPayload:
+        return RepPayload(status="ok", payload={f"channel_{n}": 42.0 for n in range(1, 9)})
+
+    def get_cycle_number(self, channel: str) -> RepPayload:
+        return RepPayload(status="ok", payload={f"channel_{n}": 1234 for n in range(1, 9)})
+
+    def shutdown_channel(self, channel: str) -> RepPayload:
+        # Stands in for joining PID threads in Channel.abort
+        time.sleep(self.control_s)
+        return RepPayload(status="ok", payload="shutdown")
+
+
+def poll(port: str, codec: Optional[str], stop: threading.Event, latencies_s: List[float]) -> None:
+    client = Client(port=port, codec=codec)
+    commands = ["get_temps", "get_duty_cycle", "get_cycle_number"]
+    idx = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.send_request(commands[idx % len(commands)], {"channel": "all"})
+        latencies_s.append(time.perf_counter() - start)
+        idx += 1
+    client.socket.close(linger=0)
+
+
+def control(port: str, stop: threading.Event) -> None:
+    client = Client(port=port)
+    while not stop.is_set():
+        client.send_request("shutdown_channel", {"channel": "all"})
+    client.socket.close(linger=0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["rep", "router"], nargs="+", default=["rep", "router"])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--read-workers", type=int, default=4)
+    parser.add_argument("--control-ms", type=float, default=50.0)
+    parser.add_argument("--with-control", action="store_true")
+    parser.add_argument("--port", type=int, default=5599)
+    parser.add_argument("--codec", choices=["json", "msgpack"], default=None)
+    args = parser.parse_args()
+
+    app = FakeApplication(args.control_ms * 1e-3)
+    for mode in args.mode:
+        for clients in args.clients:
+            port = str(args.port)
+            args.port += 1
+            if mode == "router":
+                server = RouterServer(app, port=port, read_workers=args.read_workers)
+            else:
+                server = Server(app, port=port)
+            server_thread = threading.Thread(target=server.run, daemon=True)
+            server_thread.start()
+
+            stop = threading.Event()
+            latencies_s: List[List[float]] = [[] for _ in range(clients)]
+            threads = [
+                threading.Thread(target=poll, args=(port, args.codec, stop, latencies_s[idx]))
+                for idx in range(clients)
+            ]
+            if args.with_control:
+                threads.append(threading.Thread(target=control, args=(port, stop)))
+            for thread in threads:
+                thread.start()
+            time.sleep(args.duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+            Client(port=port).send_request("shutdown_server")
+            server_thread.join(timeout=1.0)
+
+            latency_ms = np.concatenate([np.asarray(each) for each in latencies_s]) * 1e3
+            print(
+                f"{mode:>6} {clients:>3} clients: "
+                f"{len(latency_ms) / args.duration:9.0f} req/s, "
+                f"p50 {np.percentile(latency_ms, 50):7.3f} ms, "
+                f"p99 {np.percentile(latency_ms, 99):7.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
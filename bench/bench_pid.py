@@ -0,0 +1,55 @@
+import time
+import logging
+import argparse
+
+import numpy as np
+
+from controllers.pid import PIDController
+from controllers.vector_pid import VectorPIDController
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("bench")
+    rng = np.random.default_rng(0)
+
+    for channels in args.channels:
+        kwargs = dict(kp=30, ki=5, kd=1, output_limits=(0, 100), i_limits=None)
+        scalars = [PIDController(logger, **kwargs) for _ in range(channels)]
+        vector = VectorPIDController(logger, channels, **kwargs)
+
+        values = rng.uniform(20, 90, (args.ticks, channels))
+        setpoint = np.full(channels, 80.0)
+        setpoints = setpoint.tolist()
+        times = np.arange(args.ticks) * 0.2
+
+        scalar_out = np.empty((args.ticks, channels))
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            row = values[tick].tolist()
+            t = times[tick]
+            for ch, pid in enumerate(scalars):
+                scalar_out[tick, ch] = pid(row[ch], setpoints[ch], t)
+        scalar_s = (time.perf_counter() - start) / args.ticks
+
+        vector_out = np.empty((args.ticks, channels))
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            vector_out[tick] = vector(values[tick], setpoint, times[tick])
+        vector_s = (time.perf_counter() - start) / args.ticks
+
+        print(
+            f"{channels:>4} channels: scalar {scalar_s * 1e6:8.1f} us/tick, "
+            f"vector {vector_s * 1e6:7.1f} us/tick, "
+            f"speedup {scalar_s / vector_s:5.1f}x, "
+            f"max diff {np.abs(scalar_out - vector_out).max():.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
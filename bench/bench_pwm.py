@@ -0,0 +1,54 @@
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+from hardware.cpc1706y import CPC1706Y
+from hardware.pwm import SysfsPWM
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--resolution", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("bench")
+    rng = np.random.default_rng(0)
+
+    # Heater output mostly sits at a rail or drifts slowly near the setpoint
+    steps = rng.normal(0, 0.2, (args.ticks, args.channels))
+    duty = np.clip(np.cumsum(steps, axis=0) + rng.uniform(0, 100, args.channels), 0, 100)
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "pwmchip0"))
+        ssrs = [
+            CPC1706Y(logger, pin=ch, freq=50, pwm=SysfsPWM(root, 0, ch, 50), resolution=args.resolution)
+            for ch in range(args.channels)
+        ]
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            for ch, ssr in enumerate(ssrs):
+                ssr.set_duty_cycle(duty[tick, ch])
+        elapsed = time.perf_counter() - start
+
+        raw = [SysfsPWM(root, 0, ch, 50) for ch in range(args.channels)]
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            for ch, pwm in enumerate(raw):
+                pwm.change_duty_cycle(duty[tick, ch])
+        raw_elapsed = time.perf_counter() - start
+
+        updates = sum(ssr.updates for ssr in ssrs)
+        skipped = sum(ssr.skipped for ssr in ssrs)
+        print(f"every tick:  {raw_elapsed / args.ticks * 1e6:8.1f} us/tick, {args.ticks * args.channels} writes")
+        print(f"skip same:   {elapsed / args.ticks * 1e6:8.1f} us/tick, {updates} writes, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
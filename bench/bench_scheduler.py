@@ -0,0 +1,50 @@
+import time
+import logging
+import argparse
+
+from app.scheduler import DeadlineScheduler
+
+
+def busy(work_s: float):
+    def callback() -> None:
+        end = time.perf_counter() + work_s
+        while time.perf_counter() < end:
+            pass
+    return callback
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--channel-period", type=float, default=1.0)
+    parser.add_argument("--pid-period", type=float, default=0.2)
+    parser.add_argument("--work-us", type=float, default=200)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("bench")
+
+    for channels in args.channels:
+        scheduler = DeadlineScheduler(logger)
+        for ch in range(1, channels + 1):
+            scheduler.add(f"channel_{ch}_pid", busy(args.work_us * 1e-6), args.pid_period)
+            scheduler.add(f"channel_{ch}", busy(args.work_us * 1e-6), args.channel_period)
+        scheduler.start()
+        time.sleep(args.duration)
+        scheduler.stop()
+        scheduler.join()
+
+        stats = scheduler.stats().values()
+        lateness = [task["lateness_ms"] for task in stats if task["lateness_ms"]["count"]]
+        print(
+            f"{channels:>4} channels: "
+            f"ticks {sum(each['count'] for each in lateness):>6}, "
+            f"mean lateness {sum(each['mean'] * each['count'] for each in lateness) / sum(each['count'] for each in lateness):6.3f} ms, "
+            f"worst {max(each['max'] for each in lateness):6.3f} ms, "
+            f"overruns {sum(task['overruns'] for task in stats)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
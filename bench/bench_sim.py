@@ -0,0 +1,88 @@
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+from config.config import Config
+from app.app import Application
+
+
+def sim_config(args: argparse.Namespace, root: str) -> Config:
+    config = Config.from_file(args.config)
+    config.merge(config)
+    config.app.hardware = "sim"
+    config.app.runtime = args.runtime
+    config.app.clock.type = args.clock
+    config.app.clock.time_scale = args.time_scale
+    config.app.checkpoint.directory = os.path.join(root, "checkpoints")
+
+    for name, channel in config.app.items():
+        if not name.startswith("channel_"):
+            continue
+        channel.cycle_no = 0
+        channel.time_warm_s = args.time_warm_s
+        channel.time_cool_s = args.time_cool_s
+        channel.csv.base_path = os.path.join(root, name, "")
+        channel.csv.cycle_path = os.path.join(root, name, "cycles", "")
+        os.makedirs(channel.csv.cycle_path)
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--runtime", default="threaded", choices=["threaded", "scheduler", "asyncio"])
+    parser.add_argument("--clock", default="scaled", choices=["system", "scaled", "virtual"])
+    parser.add_argument("--duration", type=float, default=600.0, help="simulated seconds")
+    parser.add_argument("--report", type=float, default=60.0, help="simulated seconds between reports")
+    parser.add_argument("--time-scale", type=float, default=10.0)
+    parser.add_argument("--time-warm-s", type=float, default=5.0)
+    parser.add_argument("--time-cool-s", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, os.environ.get("LOG_LEVEL", "WARNING")), format="%(asctime)s %(threadName)s %(message)s")
+    logger = logging.getLogger("bench_sim")
+
+    with tempfile.TemporaryDirectory() as root:
+        config = sim_config(args, root)
+        config_path = os.path.join(root, "config.yaml")
+        config.save(config_path)
+
+        app = Application(config.app, logger, config_path)
+        startup = app.startup_stats
+        print(
+            f"startup {startup['total_s'] * 1e3:.1f} ms with {startup['workers']} workers "
+            f"({startup['serial_s'] * 1e3:.1f} ms of channel setup)"
+        )
+        app.launch()
+        start = app.clock.monotonic()
+        real_start = time.monotonic()
+        next_report = args.report
+        while app.clock.monotonic() - start < args.duration:
+            time.sleep(0.01)
+            if app.clock.monotonic() - start < next_report:
+                continue
+            next_report += args.report
+            temps = app.get_temps("all")["payload"]
+            cycles = app.get_cycle_number("all")["payload"]
+            print(
+                f"t={app.clock.monotonic() - start:8.1f}s "
+                + " ".join(f"{name[8:]}:{max(temps[name]):5.1f}C/c{cycles[name]}" for name in temps)
+            )
+        elapsed = time.monotonic() - real_start
+        print(f"simulated {app.clock.monotonic() - start:.0f} s in {elapsed:.1f} s ({(app.clock.monotonic() - start) / elapsed:.0f}x)")
+        if app.scheduler is not None:
+            for name, stats in app.scheduler.stats().items():
+                print(f"{name}: lateness {stats['lateness_ms']}")
+        app.shutdown()
+        if app.persistence is not None:
+            stats = app.persistence.stats()
+            print(
+                f"persisted {stats['completed']} rotations, "
+                f"latency {stats['latency_ms']}, queue depth {stats['queue_depth']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import zmq
+
+from app_ipc.client import Client
+
+
+MODULES = [
+    "app_ipc.client",
+    "config.config",
+    "data.dataframes",
+    "data.history",
+    "hardware.sim",
+    "app_ipc.server",
+    "app.app",
+]
+# A CLI client should only need zmq and json
+CLIENT_FORBIDDEN = ["pandas", "yaml", "smbus2", "RPi", "Phidget22", "numpy"]
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(name for name in {forbidden!r} if name in sys.modules))
+"""
+
+
+def time_import(module: str, repeat: int) -> tuple:
+    env = dict(os.environ, PYTHONPATH="lib")
+    times = []
+    loaded = ""
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT.format(module=module, forbidden=CLIENT_FORBIDDEN)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else ""
+    return statistics.median(times), loaded
+
+
+def serve(args: argparse.Namespace) -> None:
+    from config.config import Config
+    from app.app import Application
+    from app_ipc.server import CreateServer
+    from bench_sim import sim_config
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("bench_startup")
+    with tempfile.TemporaryDirectory() as root:
+        config = sim_config(args, root)
+        config_path = os.path.join(root, "config.yaml")
+        config.save(config_path)
+        app = Application(config.app, logger, config_path)
+        ipc = config.get("ipc", Config())
+        ipc.port = str(args.port)
+        server = CreateServer(ipc, app)
+        app.launch()
+        server.run()
+        app.shutdown()
+
+
+def first_reply(args: argparse.Namespace) -> float:
+    script = os.path.abspath(__file__)
+    env = dict(os.environ, PYTHONPATH="lib")
+    start = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, script, "--serve", "--port", str(args.port), "--config", args.config],
+        env=env,
+    )
+    client = Client(port=str(args.port))
+    client.socket.setsockopt(zmq.RCVTIMEO, int(args.timeout_s * 1e3))
+    try:
+        reply = client.send_request("get_temps", {"channel": "all"})
+        elapsed = time.perf_counter() - start
+        if reply["status"] != "ok":
+            raise RuntimeError(f"get_temps failed: {reply['payload']}")
+        client.send_request("shutdown_server")
+    finally:
+        client.socket.close(linger=0)
+        child.wait(args.timeout_s)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--port", type=int, default=5598)
+    parser.add_argument("--timeout-s", type=float, default=60.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # sim_config reads these from the bench_sim command line
+    args.runtime = "threaded"
+    args.clock = "system"
+    args.time_scale = 1.0
+    args.time_warm_s = 60.0
+    args.time_cool_s = 60.0
+
+    if args.serve:
+        serve(args)
+        return
+
+    failed = False
+    for module in MODULES:
+        elapsed, loaded = time_import(module, args.repeat)
+        print(f"import {module:<18} {elapsed * 1e3:8.1f} ms  {loaded}")
+        if module == "app_ipc.client" and loaded:
+            print(f"  client pulled in {loaded}")
+            failed = True
+
+    replies = [first_reply(args) for _ in range(args.repeat)]
+    print(f"first get_temps reply {statistics.median(replies) * 1e3:8.1f} ms (median of {args.repeat})")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,25 @@
-import RPi.GPIO as gpio
-from typing import Dict
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from config.config import Config
 from config.logger_manager import LoggerManager
 from app.channel import Channel, CreateChannel
+from app.scheduler import BaseScheduler, DeadlineScheduler
+from app.async_runtime import AsyncScheduler
+from app.persistence import PersistenceWorker
+from clock.clock import CreateClock
+from data.checkpoint import CheckpointStore
+from hardware.backend import CreateBackend
+from hardware.ads7142 import register_thermistor
 from app_ipc.payloads import RepPayload
+from app_ipc.telemetry import TelemetryPublisher
+
+
+CONFIG_PATH = "/home/pi/heater_cycle_test/config/config.yaml"
+CHANNEL_NAME = re.compile(r"channel_(\d+)$")
 
 
 class Application:
@@ -12,66 +27,125 @@ class Application:
         self,
         config: Config,
         logger: LoggerManager,
+        config_path: str=CONFIG_PATH,
+        telemetry: Optional[TelemetryPublisher]=None,
     ) -> None:
         self.config = config
         self.logger = logger
+        self.config_path = config_path
+        self.telemetry = telemetry
         self.channels: Dict[str, Channel] = {}
+        self.scheduler: Optional[BaseScheduler] = None
+        self.persistence: Optional[PersistenceWorker] = None
+        self.startup_stats: Dict[str, Any] = {}
 
         self.configure()
         self.setup()
 
     def configure(self) -> None:
-        gpio.setmode(gpio.BCM)
+        self.clock = CreateClock(self.config.get("clock"))
+        self.backend = CreateBackend(self.config, self.logger, self.clock)
+        self.backend.configure()
 
-    def setup(self) -> None:
-        if self.config.channel_1.enabled:
-            self.channels["channel_1"] = CreateChannel(
-                self.config.channel_1,
-                self.logger,
-                1,
-            ) 
-        if self.config.channel_2.enabled:
-            self.channels["channel_2"] = CreateChannel(
-                self.config.channel_2,
-                self.logger,
-                2,
-            )
-        if self.config.channel_3.enabled:
-            self.channels["channel_3"] = CreateChannel(
-                self.config.channel_3,
-                self.logger,
-                3,
-            ) 
-        if self.config.channel_4.enabled:
-            self.channels["channel_4"] = CreateChannel(
-                self.config.channel_4,
-                self.logger,
-                4,
-            )
-        if self.config.channel_5.enabled:
-            self.channels["channel_5"] = CreateChannel(
-                self.config.channel_5,
-                self.logger,
-                5,
-            ) 
-        if self.config.channel_6.enabled:
-            self.channels["channel_6"] = CreateChannel(
-                self.config.channel_6,
+        checkpoint = self.config.get("checkpoint", Config())
+        self.checkpoints = CheckpointStore(
+            checkpoint.get(
+                "directory",
+                os.path.join(os.path.dirname(self.config_path), "checkpoints"),
+            ),
+            sync=checkpoint.get("sync", True),
+        )
+
+        persistence = self.config.get("persistence", Config())
+        if persistence.get("enabled", False):
+            self.persistence = PersistenceWorker(
                 self.logger,
-                6,
+                queue_size=persistence.get("queue_size", 16),
+                put_timeout_s=persistence.get("put_timeout_s", 1.0),
             )
-        if self.config.channel_7.enabled:
-            self.channels["channel_7"] = CreateChannel(
-                self.config.channel_7,
-                self.logger,
-                7,
-            ) 
-        if self.config.channel_8.enabled:
-            self.channels["channel_8"] = CreateChannel(
-                self.config.channel_8,
+            self.persistence.start()
+
+        runtime = self.config.get("runtime", "threaded")
+        if runtime == "scheduler":
+            self.logger.info("Driving all channels from a single deadline scheduler")
+            self.scheduler = DeadlineScheduler(self.logger, clock=self.clock)
+            self.scheduler.start()
+        elif runtime == "asyncio":
+            self.logger.info("Driving all channels from an asyncio event loop")
+            self.scheduler = AsyncScheduler(
                 self.logger,
-                8,
+                max_workers=self.config.get("io_workers", 4),
+                clock=self.clock,
             )
+            self.scheduler.start()
+        elif runtime != "threaded":
+            raise ValueError(f"Unknown runtime {runtime}")
+
+    def setup(self) -> None:
+        for name, table in self.config.get("thermistors", {}).items():
+            register_thermistor(name, table)
+
+        channels = self.discover_channels()
+        workers = max(1, min(self.config.get("startup_workers", len(channels)), len(channels)))
+        self.logger.info(f"Creating {len(channels)} channels with {workers} startup workers")
+        start = time.perf_counter()
+        # Channels do share the I2C bus manager and relay hubs, but those lock their own
+        # registries, so each channel's I2C, relay and CSV setup can overlap
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="channel_setup") as executor:
+            futures = {
+                name: executor.submit(self.create_channel, name, number)
+                for name, number in channels
+            }
+        timings: Dict[str, float] = {}
+        for name, future in futures.items():
+            self.channels[name], timings[name] = future.result()
+
+        # Relay handles attach in parallel while the channels are built; a fan that
+        # never attached would leave its heater cycling uncooled, so refuse to launch
+        relay_start = time.perf_counter()
+        try:
+            self.backend.wait_ready()
+        except Exception:
+            self.shutdown()
+            raise
+        end = time.perf_counter()
+
+        self.startup_stats = {
+            "workers": workers,
+            "total_s": end - start,
+            "channels_s": timings,
+            "serial_s": sum(timings.values()),
+            "relays_s": end - relay_start,
+        }
+        for name, elapsed_s in sorted(timings.items(), key=lambda item: -item[1]):
+            self.logger.info(f"{name} ready in {elapsed_s:.3f} s")
+        self.logger.info(
+            f"Started {len(timings)} channels in {end - start:.3f} s "
+            f"({sum(timings.values()):.3f} s of channel setup)"
+        )
+
+    def discover_channels(self) -> List[Tuple[str, int]]:
+        channels = []
+        for name, config in self.config.items():
+            match = CHANNEL_NAME.match(name)
+            if match is not None and config.get("enabled", False):
+                channels.append((name, int(match.group(1))))
+        return sorted(channels, key=lambda item: item[1])
+
+    def create_channel(self, name: str, number: int) -> Tuple[Channel, float]:
+        start = time.perf_counter()
+        channel = CreateChannel(
+            self.config.get(name),
+            self.logger,
+            number,
+            self.backend,
+            self.scheduler,
+            self.checkpoints,
+            self.clock,
+            self.telemetry,
+            self.persistence,
+        )
+        return channel, time.perf_counter() - start
 
     def launch(self) -> None:
         self.logger.info("Starting channel threads")
@@ -84,7 +158,44 @@ class Application:
             channel.abort()
             channel.join()
 
-        gpio.cleanup()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler.join()
+
+        if self.persistence is not None:
+            self.persistence.stop()
+            self.persistence.join()
+
+        self.backend.cleanup()
+        if self.telemetry is not None:
+            self.telemetry.close()
+
+    def get_scheduler_stats(self) -> RepPayload:
+        if self.scheduler is None:
+            return RepPayload(status="error", payload="Scheduler or asyncio runtime is not enabled")
+        stats = self.scheduler.stats()
+        for channel in self.channels.values():
+            task = stats.get(f"channel_{channel.channel}_pid")
+            if task is not None:
+                task["skipped_updates"] = channel.heater_controller.skipped_updates
+        return RepPayload(status="ok", payload=stats)
+
+    def get_persistence_stats(self) -> RepPayload:
+        if self.persistence is None:
+            return RepPayload(status="error", payload="Persistence worker is not enabled")
+        return RepPayload(status="ok", payload=self.persistence.stats())
+
+    def get_log_stats(self) -> RepPayload:
+        return RepPayload(status="ok", payload=LoggerManager.stats())
+
+    def get_startup_stats(self) -> RepPayload:
+        return RepPayload(status="ok", payload=self.startup_stats)
+
+    def get_bus_stats(self) -> RepPayload:
+        return RepPayload(status="ok", payload=self.backend.bus_stats())
+
+    def get_relay_stats(self) -> RepPayload:
+        return RepPayload(status="ok", payload=self.backend.relay_stats())
 
     def get_temps(self, channel: str) -> RepPayload:
         if not isinstance(channel, str):
@@ -128,6 +239,62 @@ class Application:
 
         return RepPayload(status="ok", payload=self.channels[channel].get_cycle_number())
 
+    def get_status(self, channel: str="all") -> RepPayload:
+        if not isinstance(channel, str):
+            return RepPayload(status="error", payload="Channel is of invalid type")
+        if channel == "all":
+            response = RepPayload(
+                status="ok",
+                payload={key: val.get_status() for key,val in self.channels.items()}
+            )
+            return response
+        if channel not in self.channels.keys():
+            return RepPayload(status="error", payload="Invalid channel")
+
+        return RepPayload(status="ok", payload=self.channels[channel].get_status())
+
+    def get_cycle_stats(self, channel: str="all") -> RepPayload:
+        if not isinstance(channel, str):
+            return RepPayload(status="error", payload="Channel is of invalid type")
+        if channel == "all":
+            response = RepPayload(
+                status="ok",
+                payload={key: val.get_cycle_stats() for key,val in self.channels.items()}
+            )
+            return response
+        if channel not in self.channels.keys():
+            return RepPayload(status="error", payload="Invalid channel")
+
+        return RepPayload(status="ok", payload=self.channels[channel].get_cycle_stats())
+
+    def get_history(
+        self,
+        channel: str,
+        start_cycle: Optional[int]=None,
+        end_cycle: Optional[int]=None,
+        start_time: Optional[str]=None,
+        end_time: Optional[str]=None,
+        columns: Optional[List[str]]=None,
+        buckets: Optional[int]=None,
+    ) -> RepPayload:
+        if not isinstance(channel, str):
+            return RepPayload(status="error", payload="Channel is of invalid type")
+        if channel not in self.channels.keys():
+            return RepPayload(status="error", payload="Invalid channel")
+
+        try:
+            payload = self.channels[channel].get_history(
+                start_cycle=start_cycle,
+                end_cycle=end_cycle,
+                start_time=start_time,
+                end_time=end_time,
+                columns=columns,
+                buckets=buckets,
+            )
+        except (RuntimeError, ValueError) as e:
+            return RepPayload(status="error", payload=str(e))
+        return RepPayload(status="ok", payload=payload)
+
     def shutdown_channel(self, channel: str) -> RepPayload:
         if not isinstance(channel, str):
             return RepPayload(status="error", payload="Channel is of invalid type")
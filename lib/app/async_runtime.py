@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from clock.clock import Clock, SystemClock, VirtualClock
+from config.logger_manager import LoggerManager
+from app.scheduler import BaseScheduler, ScheduledTask
+
+
+class AsyncScheduler(BaseScheduler):
+    def __init__(
+        self,
+        logger: LoggerManager,
+        max_workers: int=4,
+        stagger_s: float=0.005,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.logger = logger
+        self.stagger_s = stagger_s
+        self.clock = clock if clock is not None else SystemClock()
+        if isinstance(self.clock, VirtualClock):
+            raise ValueError("The asyncio runtime can't run on a virtual clock")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hw_io")
+        self.loop = asyncio.new_event_loop()
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self.handles: Dict[str, asyncio.Task] = {}
+        self.added = 0
+
+        self.mtx = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="event_loop")
+
+    def run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        self.logger.info("closing event loop")
+
+    def add(
+        self,
+        name: str,
+        callback: Callable[[], None],
+        period_s: float,
+    ) -> None:
+        with self.mtx:
+            offset_s = (self.added * self.stagger_s) % period_s if period_s > 0 else 0.0
+            self.added += 1
+            task = ScheduledTask(name, callback, period_s, offset_s)
+            self.tasks[name] = task
+        self.loop.call_soon_threadsafe(self.spawn, task)
+
+    def spawn(self, task: ScheduledTask) -> None:
+        previous = self.handles.get(task.name)
+        if previous is not None:
+            previous.cancel()
+        task.next_due += self.clock.monotonic()
+        self.handles[task.name] = self.loop.create_task(self.drive(task))
+
+    def cancel(self, name: str) -> None:
+        with self.mtx:
+            task = self.tasks.pop(name, None)
+            if task is not None:
+                task.cancelled = True
+        self.loop.call_soon_threadsafe(self.unspawn, name)
+
+    def unspawn(self, name: str) -> None:
+        handle = self.handles.pop(name, None)
+        if handle is not None:
+            handle.cancel()
+
+    async def drive(self, task: ScheduledTask) -> None:
+        while not task.cancelled:
+            delay_s = task.next_due - self.clock.monotonic()
+            if delay_s > 0:
+                await asyncio.sleep(self.clock.to_real_s(delay_s))
+
+            start = self.clock.monotonic()
+            task.lateness_s.add(start - task.next_due)
+            try:
+                if asyncio.iscoroutinefunction(task.callback):
+                    await task.callback()
+                else:
+                    await self.loop.run_in_executor(self.executor, task.callback)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.logger.exception(f"Scheduled task {task.name} failed - cancelling it")
+                self.cancel(task.name)
+                return
+            end = self.clock.monotonic()
+            task.duration_s.add(end - start)
+
+            task.next_due += task.period_s
+            if task.next_due < end:
+                task.overruns += 1
+                task.next_due = end
+
+    def run_in_executor(self, callback: Callable[..., Any], *args: Any) -> Awaitable[Any]:
+        return self.loop.run_in_executor(self.executor, callback, *args)
+
+    def run_until_complete(self, coro: Awaitable[Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def start(self) -> None:
+        self.thread.start()
+
+    async def shutdown(self) -> None:
+        handles = list(self.handles.values())
+        self.handles.clear()
+        for handle in handles:
+            handle.cancel()
+        await asyncio.gather(*handles, return_exceptions=True)
+        self.loop.stop()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop)
+
+    def join(self) -> None:
+        self.thread.join()
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.mtx:
+            tasks = list(self.tasks.values())
+        return {task.name: task.stats() for task in tasks}
@@ -1,18 +1,27 @@
-import time
+import os
 import threading
-import datetime
+from functools import partial
 from enum import Enum, unique
-from typing import List
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
+from clock.clock import Clock, SystemClock
 from config.config import Config
 from config.logger_manager import LoggerManager
 from controllers.pid import PIDController
+from data.checkpoint import Checkpoint, CheckpointStore
 from data.dataframes import Frame
+from data.stats import CycleStats
 from data.units import CycleDataPoint, DataPoint
-from hardware.ads7142 import ADS7142
-from hardware.cpc1706y import CPC1706Y
-from hardware.rel1101 import REL1101
-from app.heater_controller import HeaterController
+from hardware.backend import HardwareBackend
+from app.heater_controller import HeaterController, HeaterState
+from app.persistence import PersistenceWorker
+from app.scheduler import BaseScheduler
+from app.async_runtime import AsyncScheduler
+
+if TYPE_CHECKING:
+    from app_ipc.telemetry import TelemetryPublisher
+    from data.history import HistoryStore
+    from hardware.rel1101 import REL1101
 
 
 @unique
@@ -33,7 +42,7 @@ class Channel:
         logger: LoggerManager,
         channel: int,
         heater_controller: HeaterController,
-        fan_controller: REL1101,
+        fan_controller: "REL1101",
         fan_channel: int,
         high_setpoint_C: float,
         low_setpoint_C: float,
@@ -46,8 +55,17 @@ class Channel:
         time_warm_s: float,
         time_cool_s: float,
         total_cycles: int,
+        scheduler: Optional[BaseScheduler]=None,
+        checkpoints: Optional[CheckpointStore]=None,
+        clock: Optional[Clock]=None,
+        telemetry: Optional["TelemetryPublisher"]=None,
+        history: Optional["HistoryStore"]=None,
+        ss_window: int=150,
+        persistence: Optional[PersistenceWorker]=None,
+        heating_state: Optional[HeatingState]=None,
     ) -> None:
         self.logger = logger
+        self.clock = clock if clock is not None else SystemClock()
         self.channel = channel
         self.heater_controller = heater_controller
         self.fan_controller= fan_controller
@@ -61,111 +79,202 @@ class Channel:
         self.time_warm_s = time_warm_s
         self.time_cool_s = time_cool_s
         self.total_cycles = total_cycles
+        self.checkpoints = checkpoints
+        self.telemetry = telemetry
+        self.history = history
+        self.persistence = persistence
 
         self.last_rate_update: float = 0.0
         self.steady_state_start: float = 0.0
         self.steady_state_duration: float = 0.0
-        self.heating_state = HeatingState.HEATING
+        self.heating_state = heating_state if heating_state is not None else HeatingState.HEATING
         self.steady_state = SteadyState.NO
 
         self.cycle_frame = cycle_frame
         self.channel_frame = channel_frame
+        self.cycle_stats = CycleStats(ss_window)
         self.cycle_frame.set_filename(f"cycle_{self.cycle_no}")
         self.channel_frame.set_filename("cycles")
         self.channel_frame.load()
+        self.resume_cycle_frame()
 
         self.ch_thread = threading.Thread(target=self.run)
         self.pid_thread = threading.Thread(target=self.heater_controller.run)
+        self.scheduler = scheduler
 
         self.ch_cancel = threading.Event()
         self.ch_pause = threading.Event()
+        self.ch_done = threading.Event()
+        self.started = False
+        self.heating_pending = False
+        self.pause_waiting = False
+        self.status: Dict[str, Any] = {}
+        self.update_status()
         
         self.fan_controller.register_channel(self.fan_channel)
 
-        self.heater_controller.set_setpoint(self.high_setpoint_C)
-        self.pid_thread.start()
+        if self.heating_state == HeatingState.COOLING:
+            self.logger.info(f"Channel {self.channel} resuming in its cooling cycle")
+            self.fan_controller.turn_on(self.fan_channel)
+            self.heater_controller.set_setpoint(self.low_setpoint_C)
+        else:
+            self.heater_controller.set_setpoint(self.high_setpoint_C)
+        if self.scheduler is None:
+            self.pid_thread.start()
+        elif isinstance(self.scheduler, AsyncScheduler):
+            self.scheduler.add(
+                f"channel_{self.channel}_pid",
+                partial(self.heater_controller.step_async, self.scheduler.run_in_executor),
+                self.heater_controller.update_interval_s,
+            )
+        else:
+            self.scheduler.add(
+                f"channel_{self.channel}_pid",
+                self.heater_controller.step,
+                self.heater_controller.update_interval_s,
+            )
+
+    def resume_cycle_frame(self) -> None:
+        # After a restart mid-cycle, keep the rows streamed before the crash and
+        # append after them instead of truncating the file on the first flush
+        try:
+            self.cycle_frame.load()
+        except (OSError, ValueError) as e:
+            partial_path = f"{self.cycle_frame.full_path}.partial"
+            self.logger.warning(
+                f"Channel {self.channel} can't resume {self.cycle_frame.full_path} ({e}), moving it to {partial_path}"
+            )
+            os.replace(self.cycle_frame.full_path, partial_path)
+            self.cycle_frame.reset()
+            return
+        if len(self.cycle_frame):
+            self.logger.info(f"Channel {self.channel} resuming cycle {self.cycle_no} after {len(self.cycle_frame)} rows")
+            # The cycle summary has to cover the rows from before the restart too
+            for therm_L_C, therm_R_C, duty_cycle in zip(
+                self.cycle_frame.column("therm_L_C").tolist(),
+                self.cycle_frame.column("therm_R_C").tolist(),
+                self.cycle_frame.column("duty_cycle").tolist(),
+            ):
+                self.cycle_stats.add(therm_L_C, therm_R_C, duty_cycle)
 
     def run(self) -> None:
-        while not self.ch_cancel.is_set():
-            setpoint = self.heater_controller.get_setpoint()
-            temps = self.heater_controller.get_temps()
-            temp = max(temps)
-
-            if self.heating_state == HeatingState.HEATING:
-                if setpoint == self.low_setpoint_C:
-                    self.heater_controller.set_setpoint(self.high_setpoint_C)
-                if self.steady_state == SteadyState.NO:
-                    if temp >= self.high_setpoint_C*self.hysteresis:
-                        self.logger.info(f"Channel {self.channel} achieved steady state heating")
-                        self.steady_state = SteadyState.YES
-                        self.steady_state_start = time.monotonic()
-                elif self.steady_state == SteadyState.YES:
-                    self.steady_state_duration = time.monotonic() - self.steady_state_start
-                    if self.steady_state_duration >= self.time_warm_s:
-                        self.fan_controller.turn_on(self.fan_channel)
-                        self.logger.info(f"Channel {self.channel} maintained steady state heating for sufficient time")
-                        self.heating_state = HeatingState.COOLING
-                        self.steady_state = SteadyState.NO
-                        self.steady_state_start = 0.0
-                        self.steady_state_duration = 0.0
-                        self.cycle_logs()
-                        self.heater_controller.set_setpoint(self.low_setpoint_C)
-                        self.logger.info(f"Channel {self.channel} beginning cooling cycle")
-                else:
-                    self.abort()
-                    raise RuntimeError("Invalid State - killing thread")
-            elif self.heating_state == HeatingState.COOLING:
-                if setpoint == self.high_setpoint_C:
+        with self.clock.attach():
+            while not self.ch_cancel.is_set():
+                self.step()
+                self.rate_sleep(self.update_rate_s)
+
+        self.finish()
+
+    def tick(self) -> None:
+        if self.ch_cancel.is_set():
+            self.scheduler.cancel(f"channel_{self.channel}")
+            self.finish()
+            return
+        try:
+            self.step()
+        except Exception:
+            self.finish()
+            raise
+
+    def step(self) -> None:
+        if self.heating_pending and not self.begin_heating():
+            return
+
+        state = self.heater_controller.get_snapshot()
+        setpoint = state.setpoint_C
+        temps = state.temps_C
+        temp = max(temps)
+
+        if self.heating_state == HeatingState.HEATING:
+            if setpoint == self.low_setpoint_C:
+                self.heater_controller.set_setpoint(self.high_setpoint_C)
+            if self.steady_state == SteadyState.NO:
+                if temp >= self.high_setpoint_C*self.hysteresis:
+                    self.logger.info(f"Channel {self.channel} achieved steady state heating")
+                    self.steady_state = SteadyState.YES
+                    self.steady_state_start = self.clock.monotonic()
+            elif self.steady_state == SteadyState.YES:
+                self.steady_state_duration = self.clock.monotonic() - self.steady_state_start
+                if self.steady_state_duration >= self.time_warm_s:
+                    self.fan_controller.turn_on(self.fan_channel)
+                    self.logger.info(f"Channel {self.channel} maintained steady state heating for sufficient time")
+                    self.heating_state = HeatingState.COOLING
+                    self.steady_state = SteadyState.NO
+                    self.steady_state_start = 0.0
+                    self.steady_state_duration = 0.0
+                    self.cycle_logs()
                     self.heater_controller.set_setpoint(self.low_setpoint_C)
-                if self.steady_state == SteadyState.NO:
-                    if temp <= self.cool_threshold_C:
-                        self.logger.info(f"Channel {self.channel} achieved steady state cooling")
-                        self.steady_state = SteadyState.YES
-                        self.steady_state_start = time.monotonic()
-                elif self.steady_state == SteadyState.YES:
-                    self.steady_state_duration = time.monotonic() - self.steady_state_start
-                    if self.steady_state_duration >= self.time_cool_s:
-                        self.fan_controller.turn_off(self.fan_channel)
-                        self.logger.info(f"Channel {self.channel} maintained steady state cooling for sufficient time")
-                        self.heating_state = HeatingState.HEATING
-                        self.steady_state = SteadyState.NO
-                        self.steady_state_start = 0.0
-                        self.steady_state_duration = 0.0
-                        self.wait_for_pause()
-                        self.heater_controller.set_setpoint(self.high_setpoint_C)
-                        self.logger.info(f"Channel {self.channel} beginning heating cycle")
-                else:
-                    self.abort()
-                    raise RuntimeError("Invalid State - killing thread")
+                    self.logger.info(f"Channel {self.channel} beginning cooling cycle")
+            else:
+                self.abort()
+                raise RuntimeError("Invalid State - killing thread")
+        elif self.heating_state == HeatingState.COOLING:
+            if setpoint == self.high_setpoint_C:
+                self.heater_controller.set_setpoint(self.low_setpoint_C)
+            if self.steady_state == SteadyState.NO:
+                if temp <= self.cool_threshold_C:
+                    self.logger.info(f"Channel {self.channel} achieved steady state cooling")
+                    self.steady_state = SteadyState.YES
+                    self.steady_state_start = self.clock.monotonic()
+            elif self.steady_state == SteadyState.YES:
+                self.steady_state_duration = self.clock.monotonic() - self.steady_state_start
+                if self.steady_state_duration >= self.time_cool_s:
+                    self.fan_controller.turn_off(self.fan_channel)
+                    self.logger.info(f"Channel {self.channel} maintained steady state cooling for sufficient time")
+                    self.heating_state = HeatingState.HEATING
+                    self.steady_state = SteadyState.NO
+                    self.steady_state_start = 0.0
+                    self.steady_state_duration = 0.0
+                    self.heating_pending = True
+                    self.begin_heating()
             else:
                 self.abort()
-                raise RuntimeError("Invalid heating state - killing thread")
+                raise RuntimeError("Invalid State - killing thread")
+        else:
+            self.abort()
+            raise RuntimeError("Invalid heating state - killing thread")
 
-            self.log_cy_data(temps)
-            self.rate_sleep(self.update_rate_s)
+        self.log_cy_data(state)
+        self.update_status()
+        self.publish_telemetry(state)
 
+    def finish(self) -> None:
         self.logger.info("closing thread")
+        self.cycle_frame.close()
         self.abort()
+        self.ch_done.set()
     
     def rate_sleep(self, period_s: float) -> None:
-        time_since_last_update_s = time.time() - self.last_rate_update
+        time_since_last_update_s = self.clock.time() - self.last_rate_update
 
         if time_since_last_update_s < period_s:
-            time.sleep(period_s - time_since_last_update_s)
+            self.clock.sleep(period_s - time_since_last_update_s)
 
-        self.last_rate_update = time.time()
+        self.last_rate_update = self.clock.time()
 
     def start(self) -> None:
-        self.ch_thread.start()
+        self.started = True
+        if self.scheduler is None:
+            self.ch_thread.start()
+        else:
+            self.scheduler.add(f"channel_{self.channel}", self.tick, self.update_rate_s)
 
     def join(self) -> None:
-        self.ch_thread.join()
+        if not self.started:
+            return
+        if self.scheduler is None:
+            self.ch_thread.join()
+        elif self.started:
+            self.ch_done.wait()
 
     def abort(self) -> None:
         self.logger.info(f"Channel {self.channel} aborting")
         self.fan_controller.turn_off(self.fan_channel)
         self.heater_controller.abort()
-        self.pid_thread.join()
+        if self.scheduler is None:
+            self.pid_thread.join()
+        else:
+            self.scheduler.cancel(f"channel_{self.channel}_pid")
         self.ch_cancel.set()
 
     def pause(self) -> None:
@@ -176,53 +285,134 @@ class Channel:
         self.logger.info(f"Clearing pause flag on channel {self.channel}")
         self.ch_pause.clear()
 
-    def wait_for_pause(self) -> None:
-        if self.ch_pause.is_set():
+    def wait_for_pause(self) -> bool:
+        if not self.ch_pause.is_set():
+            self.pause_waiting = False
+            return False
+        if not self.pause_waiting:
             self.logger.info(f"Channel {self.channel} waiting for pause to clear")
-        while self.ch_pause.is_set():
-            self.rate_sleep(self.update_rate_s)
+            self.pause_waiting = True
+        return True
 
-    def log_cy_data(self, temps: List[float]) -> None:
+    def begin_heating(self) -> bool:
+        if self.wait_for_pause():
+            return False
+        self.heating_pending = False
+        self.heater_controller.set_setpoint(self.high_setpoint_C)
+        self.logger.info(f"Channel {self.channel} beginning heating cycle")
+        checkpoint = self.checkpoint(self.cycle_no, HeatingState.HEATING)
+        if self.persistence is None:
+            self.save_checkpoint(checkpoint)
+        else:
+            self.persistence.submit(
+                f"channel_{self.channel}_checkpoint",
+                lambda: self.save_checkpoint(checkpoint),
+            )
+        return True
+
+    def log_cy_data(self, state: HeaterState) -> None:
         cy_data = DataPoint(
-            datetime.datetime.now(),
-            temps[0],
-            temps[1],
-            self.heater_controller.get_dc(),
+            self.clock.now(),
+            state.temps_C[0],
+            state.temps_C[1],
+            state.dc,
             self.cycle_no,
         )
         self.cycle_frame.add_row(cy_data)
-
-    def log_ch_data(self) -> None:
-        ch_data = CycleDataPoint(
-            self.cycle_frame.df[["therm_L_C", "therm_R_C"]].values.max(),
-            self.cycle_frame.df[["therm_L_C", "therm_R_C"]].values.min(),
-            self.cycle_frame.df["therm_R_C"].tail(150).mean(),
-            self.cycle_frame.df["duty_cycle"].tail(150).mean(),
+        self.cycle_stats.add(state.temps_C[0], state.temps_C[1], state.dc)
+
+    def publish_telemetry(self, state: HeaterState) -> None:
+        if self.telemetry is None:
+            return
+        self.telemetry.publish(self.channel, {
+            "timestamp": state.timestamp,
+            "temps_C": list(state.temps_C),
+            "duty_cycle": state.dc,
+            "setpoint_C": state.setpoint_C,
+            "state": self.heating_state.name,
+            "steady_state": self.steady_state.name,
+            "cycle": self.cycle_no,
+        })
+
+    def log_ch_data(self) -> CycleDataPoint:
+        return CycleDataPoint(
+            self.cycle_stats.temps_C.max,
+            self.cycle_stats.temps_C.min,
+            self.cycle_stats.ss_temp_C.mean,
+            self.cycle_stats.ss_pwm.mean,
             self.cycle_no
         )
-        self.channel_frame.add_row(ch_data)
 
     def cycle_logs(self) -> None:
         self.logger.info(f"Rotating logs on channel {self.channel}")
-        self.log_ch_data()
-        self.channel_frame.save()
-        self.cycle_frame.save()
-        self.cycle_frame.reset()
+        ch_data = self.log_ch_data()
+        cycle_no = self.cycle_no
+        cycle_frame = self.cycle_frame.detach()
+        self.cycle_stats.reset()
         self.cycle_no += 1
-        self.save_curr_cycle()
+        self.update_status()
         self.cycle_frame.set_filename(f"cycle_{self.cycle_no}")
 
+        # File writes and the config rewrite happen off the control path
+        rotate = lambda: self.rotate_logs(ch_data, cycle_frame, cycle_no)
+        if self.persistence is None:
+            rotate()
+        else:
+            self.persistence.submit(f"channel_{self.channel}_cycle_{cycle_no}", rotate)
+
         if self.cycle_no >= self.total_cycles:
             self.logger.info(f"Channel {self.channel} achieved {self.total_cycles} cycles")
             self.abort()
 
-    def save_curr_cycle(self) -> None:
-        config = Config.from_file("/home/pi/heater_cycle_test/config/config.yaml")
-        config.merge(config)
-
-        config.app[f"channel_{self.channel}"]["cycle_no"] = self.cycle_no
-        config.save("/home/pi/heater_cycle_test/config/config.yaml")
-        self.logger.info(f"Updated cycle_no for channel{self.channel} in config.yaml")
+    def rotate_logs(self, ch_data: CycleDataPoint, cycle_frame: Frame, cycle_no: int) -> None:
+        self.channel_frame.add_row(ch_data)
+        self.channel_frame.save()
+        cycle_frame.save()
+        cycle_frame.close()
+        if self.history is not None:
+            self.history.record(
+                cycle_no,
+                cycle_frame.full_path,
+                {header: cycle_frame.column(header) for header in cycle_frame.headers},
+            )
+        self.save_checkpoint(self.checkpoint(cycle_no + 1, HeatingState.COOLING))
+
+    def checkpoint(self, cycle_no: int, heating_state: HeatingState) -> Checkpoint:
+        return Checkpoint(cycle_no, heating_state.value, self.clock.time())
+
+    def save_checkpoint(self, checkpoint: Checkpoint) -> None:
+        if self.checkpoints is None:
+            return
+        self.checkpoints.save(self.channel, checkpoint)
+        self.logger.debug(f"Checkpointed channel {self.channel} at cycle {checkpoint.cycle_no}")
+
+    def update_status(self) -> None:
+        # Built by the channel thread and swapped in whole, readers never see a half update
+        self.status = {
+            "state": self.heating_state.name,
+            "steady_state": self.steady_state.name,
+            "steady_state_duration_s": self.steady_state_duration,
+            "time_warm_s": self.time_warm_s,
+            "time_cool_s": self.time_cool_s,
+            "cycle": self.cycle_no,
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        status = dict(self.status)
+        status.update(self.heater_controller.get_state())
+        status["paused"] = self.ch_pause.is_set()
+        status["done"] = self.ch_done.is_set()
+        return status
+
+    def get_cycle_stats(self) -> Dict[str, Any]:
+        stats = self.cycle_stats.to_dict()
+        stats["cycle"] = self.cycle_no
+        return stats
+
+    def get_history(self, **query: Any) -> Dict[str, Any]:
+        if self.history is None:
+            raise RuntimeError(f"History is not enabled on channel {self.channel}")
+        return self.history.query(**query)
 
     def get_temps(self) -> List[int]:
         return self.heater_controller.get_temps()
@@ -238,17 +428,15 @@ def CreateChannel(
     config: Config,
     logger: LoggerManager,
     channel: int,
+    backend: HardwareBackend,
+    scheduler: Optional[BaseScheduler]=None,
+    checkpoints: Optional[CheckpointStore]=None,
+    clock: Optional[Clock]=None,
+    telemetry: Optional["TelemetryPublisher"]=None,
+    persistence: Optional[PersistenceWorker]=None,
 ) -> Channel:
-    ssr=CPC1706Y(
-        logger=logger,
-        pin=config.ssr.pin,
-        freq=config.ssr.freq,
-    )
-    therms=ADS7142(
-        logger=logger,
-        bus_number=config.i2c.bus,
-        device_address=config.i2c.add,
-    )
+    ssr=backend.create_ssr(config, channel)
+    therms=backend.create_therms(config, channel)
     pid_controller=PIDController(
         logger=logger,
         kp=config.controller.pid.kp,
@@ -258,6 +446,7 @@ def CreateChannel(
         p_limits=config.controller.pid.p_limits,
         i_limits=config.controller.pid.i_limits,
         d_limits=config.controller.pid.d_limits,
+        clock=clock,
     )
     heater_controller=HeaterController(
         logger=logger,
@@ -269,23 +458,45 @@ def CreateChannel(
         maximum_overshoot_C=config.controller.maximum_overshoot_C,
         shutoff_temperature_C=config.controller.shutoff_temperature_C,
         safe_output=config.controller.safe_output_C,
+        clock=clock,
     )
-    fan_controller = REL1101(
-        logger=logger,
-        hub_port=config.fan.port,
-        timeout=config.fan.timeout,
-    )
+    fan_controller = backend.create_fan_controller(config, channel)
     cycle_frame=Frame(
         config.csv.name,
         config.csv.loop_headers,
         config.csv.cycle_path,
+        stream=config.csv.get("stream", False),
+        flush_rows=config.csv.get("flush_rows", 60),
     )
     channel_frame=Frame(
         config.csv.name,
         config.csv.cycle_headers,
         config.csv.base_path,
+        stream=config.csv.get("stream", False),
     )
 
+    history = None
+    if config.csv.get("history", False):
+        from data.history import HistoryStore
+        history = HistoryStore(
+            config.csv.cycle_path,
+            config.csv.loop_headers,
+            max_rows=config.csv.get("history_max_rows", 10000),
+        )
+
+    cycle_no = config.cycle_no
+    heating_state = HeatingState.HEATING
+    if checkpoints is not None:
+        try:
+            checkpoint = checkpoints.load(channel)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint for channel {channel}: {e}")
+            checkpoint = None
+        if checkpoint is not None:
+            logger.info(f"Resuming channel {channel} at cycle {checkpoint.cycle_no}")
+            cycle_no = checkpoint.cycle_no
+            heating_state = HeatingState(checkpoint.heating_state)
+
     logger.info(f"Created channel {channel}")
     return Channel(
         logger=logger,
@@ -298,11 +509,19 @@ def CreateChannel(
         update_rate_s=config.update_rate_s,
         cycle_frame=cycle_frame,
         channel_frame=channel_frame,
-        cycle_no=config.cycle_no,
+        cycle_no=cycle_no,
         hysteresis=config.hysteresis,
         cool_threshold_C=config.cool_threshold_C,
         time_warm_s=config.time_warm_s,
         time_cool_s=config.time_cool_s,
         total_cycles=config.total_cycles,
+        scheduler=scheduler,
+        checkpoints=checkpoints,
+        clock=clock,
+        telemetry=telemetry,
+        history=history,
+        ss_window=config.get("ss_window", 150),
+        persistence=persistence,
+        heating_state=heating_state,
     )
 
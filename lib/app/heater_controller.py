@@ -1,14 +1,26 @@
-import time
-from typing import List, TypeVar, Generic, Optional
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, TypeVar, Generic, Optional, Tuple, TYPE_CHECKING
 from threading import Lock, Event
 
+from clock.clock import Clock, SystemClock
 from config.logger_manager import LoggerManager
 from controllers.pid import PIDController
-from hardware.ads7142 import ADS7142
-from hardware.cpc1706y import CPC1706Y
+
+if TYPE_CHECKING:
+    from hardware.ads7142 import ADS7142
+    from hardware.cpc1706y import CPC1706Y
 
 
 OutputType = TypeVar("OutputType", bound=float)
+# Fixed-rate schedulers jitter around the period, so a tick a little early still counts
+UPDATE_TOLERANCE = 0.5
+
+
+class HeaterState(NamedTuple):
+    version: int
+    timestamp: float
+    temps_C: Tuple[float, ...]
+    dc: float
+    setpoint_C: Optional[float]
 
 
 class HeaterController(Generic[OutputType]):
@@ -16,15 +28,17 @@ class HeaterController(Generic[OutputType]):
         self,
         logger: LoggerManager,
         pid: PIDController,
-        ssr: CPC1706Y,
-        therms: ADS7142,
+        ssr: "CPC1706Y",
+        therms: "ADS7142",
         update_interval_s: float,
         minimum_plausible_reading_C: float,
         maximum_overshoot_C: float,
         shutoff_temperature_C: float,
-        safe_output: Optional[OutputType] = None
+        safe_output: Optional[OutputType] = None,
+        clock: Optional[Clock] = None,
     ) -> None:
         self.logger = logger
+        self.clock = clock if clock is not None else SystemClock()
         self.pid = pid
         self.ssr = ssr
         self.therms = therms
@@ -35,40 +49,55 @@ class HeaterController(Generic[OutputType]):
         if safe_output is None:
             safe_output = min(self.pid.output_limits)
         self.safe_output = safe_output
-        self.time_of_last_update = time.monotonic()
-        self.time_of_last_sleep = time.monotonic()
+        self.time_of_last_update = self.clock.monotonic()
+        self.time_of_last_sleep = self.clock.monotonic()
         self.reading_timeout_s = 20
+        self.skipped_updates = 0
 
-        self.setpoint_C: float = None
-        self.temps_C: List[float] = [0, 0]
-        self.dc: int = 0
+        # Readers take self.state without locking; writers build a new
+        # snapshot under state_mtx and swap the reference in one assignment
+        self.state = HeaterState(0, self.clock.time(), (0, 0), 0, None)
+        self.state_mtx = Lock()
 
-        self.setpoint_mtx = Lock()
-        self.temp_mtx = Lock()
-        self.dc_mtx = Lock()
-        
         self.pid_cancel = Event()
     
     def run(self) -> None:
-        while not self.pid_cancel.is_set():
-            temps_C = self.therms.read_thermistor_values()
-            input_C = max(temps_C)
-            dc = self.update(input_C)
-            if dc is not None:
-                self.ssr.set_duty_cycle(dc)
-                self.set_dc(dc)
-            self.set_temps(temps_C)
-
-            self.rate_sleep(self.update_interval_s)
+        with self.clock.attach():
+            while not self.pid_cancel.is_set():
+                self.step()
+                self.rate_sleep(self.update_interval_s)
 
         self.logger.info("closing heater controller")
 
+    def step(self) -> None:
+        temps_C = self.therms.read_thermistor_values()
+        dc = self.update(max(temps_C))
+        if dc is not None:
+            self.ssr.set_duty_cycle(dc)
+        self.record(temps_C, dc)
+
+    async def step_async(self, run_io: Callable[..., Awaitable[Any]]) -> None:
+        # Control math stays on the event loop; only the driver calls go to run_io
+        temps_C = await run_io(self.therms.read_thermistor_values)
+        dc = self.update(max(temps_C))
+        if dc is not None:
+            await run_io(self.ssr.set_duty_cycle, dc)
+        self.record(temps_C, dc)
+
+    def record(self, temps_C: List[float], dc: Optional[float]) -> None:
+        if dc is None:
+            self.publish(temps_C=tuple(temps_C))
+            return
+        self.publish(temps_C=tuple(temps_C), dc=dc)
+
     def update(self, temperature_C: float) -> float:
-        if self.setpoint_C is None:
+        setpoint_C = self.state.setpoint_C
+        if setpoint_C is None:
             return None
-        now = time.monotonic()
+        now = self.clock.monotonic()
         time_since_update_s = now - self.time_of_last_update
-        if time_since_update_s < self.update_interval_s:
+        if time_since_update_s < self.update_interval_s * UPDATE_TOLERANCE:
+            self.skipped_updates += 1
             return None
 
         if temperature_C < self.minimum_plausible_reading_C:
@@ -101,46 +130,61 @@ class HeaterController(Generic[OutputType]):
                 )
             )
             return self.safe_output
-        if temperature_C - self.setpoint_C > self.maximum_overshoot_C:
+        if temperature_C - setpoint_C > self.maximum_overshoot_C:
             return self.safe_output
-        return self.pid(temperature_C, self.setpoint_C)
+        return self.pid(temperature_C, setpoint_C)
 
     def rate_sleep(self, period_s: float) -> None:
-        time_since_last_update_s = time.monotonic() - self.time_of_last_sleep
+        time_since_last_update_s = self.clock.monotonic() - self.time_of_last_sleep
 
         if time_since_last_update_s < period_s:
-            time.sleep(period_s - time_since_last_update_s)
+            self.clock.sleep(period_s - time_since_last_update_s)
 
-        self.time_of_last_sleep = time.monotonic()
+        self.time_of_last_sleep = self.clock.monotonic()
 
     def abort(self) -> None:
         self.pid_cancel.set()
 
+    def publish(self, **changes: Any) -> HeaterState:
+        with self.state_mtx:
+            self.state = self.state._replace(
+                version=self.state.version + 1,
+                timestamp=self.clock.time(),
+                **changes,
+            )
+            return self.state
+
     def set_setpoint(self, setpoint_C: float) -> None:
-        with self.setpoint_mtx:
-            if setpoint_C is None:
-                self.logger.info("Changing set point to None")
-            else:
-                self.logger.info("Changing set point to {:.1f} C".format(setpoint_C))
-            self.setpoint_C = setpoint_C
+        if setpoint_C is None:
+            self.logger.info("Changing set point to None")
+        else:
+            self.logger.info("Changing set point to {:.1f} C".format(setpoint_C))
+        self.publish(setpoint_C=setpoint_C)
 
     def set_temps(self, temps: List[float]) -> None:
-        with self.temp_mtx:
-            self.temps_C = temps
+        self.publish(temps_C=tuple(temps))
 
     def set_dc(self, dc: int) -> None:
-        with self.dc_mtx:
-            self.dc = dc
+        self.publish(dc=dc)
+
+    def get_snapshot(self) -> HeaterState:
+        return self.state
 
     def get_setpoint(self) -> float:
-        with self.setpoint_mtx:
-            return self.setpoint_C
+        return self.state.setpoint_C
 
     def get_temps(self) -> List[float]:
-        with self.temp_mtx:
-            return self.temps_C
+        return list(self.state.temps_C)
 
     def get_dc(self) -> int:
-        with self.dc_mtx:
-            return self.dc
-
+        return self.state.dc
+
+    def get_state(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "temps_C": list(state.temps_C),
+            "duty_cycle": state.dc,
+            "setpoint_C": state.setpoint_C,
+            "timestamp": state.timestamp,
+            "version": state.version,
+        }
@@ -0,0 +1,91 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.logger_manager import LoggerManager
+from data.stats import RunningStats
+
+
+Job = Tuple[str, Callable[[], None], float]
+
+
+class PersistenceWorker:
+    def __init__(
+        self,
+        logger: LoggerManager,
+        queue_size: int=16,
+        put_timeout_s: float=1.0,
+    ) -> None:
+        self.logger = logger
+        self.put_timeout_s = put_timeout_s
+        self.jobs: "queue.Queue[Optional[Job]]" = queue.Queue(queue_size)
+
+        self.mtx = threading.Lock()
+        self.latency_s = RunningStats()
+        self.duration_s = RunningStats()
+        self.depth = RunningStats()
+        self.completed = 0
+        self.failed = 0
+        self.blocked = 0
+
+        self.thread = threading.Thread(target=self.run, name="persistence")
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def submit(self, name: str, job: Callable[[], None]) -> None:
+        queued = time.perf_counter()
+        with self.mtx:
+            self.depth.add(self.jobs.qsize())
+        try:
+            self.jobs.put((name, job, queued), timeout=self.put_timeout_s)
+        except queue.Full:
+            # Running the job here could race the worker on the same channel's files and
+            # land its checkpoint ahead of older queued ones, so wait for room instead
+            self.logger.warning(f"Persistence queue full for {self.put_timeout_s} s - blocking on {name}")
+            with self.mtx:
+                self.blocked += 1
+            self.jobs.put((name, job, queued))
+
+    def run(self) -> None:
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+            self.execute(*item)
+        self.logger.info("closing persistence worker")
+
+    def execute(self, name: str, job: Callable[[], None], queued: float) -> None:
+        start = time.perf_counter()
+        try:
+            job()
+        except Exception:
+            self.logger.exception(f"Persistence job {name} failed")
+            with self.mtx:
+                self.failed += 1
+            return
+        end = time.perf_counter()
+        with self.mtx:
+            self.completed += 1
+            self.duration_s.add(end - start)
+            self.latency_s.add(end - queued)
+
+    def stop(self) -> None:
+        # Queued after every pending job, so the backlog drains before exit
+        self.jobs.put(None)
+
+    def join(self) -> None:
+        self.thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.mtx:
+            return {
+                "queued": self.jobs.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "blocked": self.blocked,
+                "queue_depth": self.depth.to_dict(),
+                "latency_ms": self.latency_s.to_dict(1e3),
+                "duration_ms": self.duration_s.to_dict(1e3),
+            }
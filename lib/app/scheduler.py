@@ -0,0 +1,175 @@
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from clock.clock import Clock, SystemClock
+from config.logger_manager import LoggerManager
+from data.stats import RunningStats
+
+
+class ScheduledTask:
+    def __init__(
+        self,
+        name: str,
+        callback: Callable[[], None],
+        period_s: float,
+        next_due: float,
+    ) -> None:
+        self.name = name
+        self.callback = callback
+        self.period_s = period_s
+        self.next_due = next_due
+        self.cancelled = False
+        self.overruns = 0
+        self.lateness_s = RunningStats()
+        self.duration_s = RunningStats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "period_ms": self.period_s * 1e3,
+            "overruns": self.overruns,
+            "lateness_ms": self.lateness_s.to_dict(1e3),
+            "duration_ms": self.duration_s.to_dict(1e3),
+        }
+
+
+class BaseScheduler(ABC):
+    @abstractmethod
+    def add(
+        self,
+        name: str,
+        callback: Callable[[], None],
+        period_s: float,
+    ) -> None:
+        raise RuntimeError("Can't call base scheduler")
+
+    @abstractmethod
+    def cancel(self, name: str) -> None:
+        raise RuntimeError("Can't call base scheduler")
+
+    @abstractmethod
+    def start(self) -> None:
+        raise RuntimeError("Can't call base scheduler")
+
+    @abstractmethod
+    def stop(self) -> None:
+        raise RuntimeError("Can't call base scheduler")
+
+    @abstractmethod
+    def join(self) -> None:
+        raise RuntimeError("Can't call base scheduler")
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        raise RuntimeError("Can't call base scheduler")
+
+
+class DeadlineScheduler(BaseScheduler):
+    def __init__(
+        self,
+        logger: LoggerManager,
+        stagger_s: float=0.005,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.logger = logger
+        self.stagger_s = stagger_s
+        self.clock = clock if clock is not None else SystemClock()
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self.heap: List[Tuple[float, int, ScheduledTask]] = []
+        self.counter = 0
+        self.added = 0
+
+        self.cond = threading.Condition()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="scheduler")
+
+    def add(
+        self,
+        name: str,
+        callback: Callable[[], None],
+        period_s: float,
+    ) -> None:
+        with self.cond:
+            if name in self.tasks:
+                self.tasks[name].cancelled = True
+            # Spread start phases so tasks sharing a period don't all fall due at once
+            offset_s = (self.added * self.stagger_s) % period_s if period_s > 0 else 0.0
+            self.added += 1
+            task = ScheduledTask(name, callback, period_s, self.clock.monotonic() + offset_s)
+            self.tasks[name] = task
+            self.push(task)
+            self.cond.notify()
+
+    def cancel(self, name: str) -> None:
+        with self.cond:
+            task = self.tasks.pop(name, None)
+            if task is not None:
+                task.cancelled = True
+            self.cond.notify()
+
+    def push(self, task: ScheduledTask) -> None:
+        self.counter += 1
+        heapq.heappush(self.heap, (task.next_due, self.counter, task))
+
+    def next_task(self) -> Optional[ScheduledTask]:
+        with self.cond:
+            while not self.cancel_event.is_set():
+                while self.heap and self.heap[0][2].cancelled:
+                    heapq.heappop(self.heap)
+                if not self.heap:
+                    self.cond.wait()
+                    continue
+                delay_s = self.heap[0][0] - self.clock.monotonic()
+                if delay_s > 0:
+                    self.clock.wait(self.cond, delay_s)
+                    continue
+                return heapq.heappop(self.heap)[2]
+            return None
+
+    def run(self) -> None:
+        with self.clock.attach():
+            self.loop()
+        self.logger.info("closing scheduler")
+
+    def loop(self) -> None:
+        while not self.cancel_event.is_set():
+            task = self.next_task()
+            if task is None:
+                break
+
+            start = self.clock.monotonic()
+            task.lateness_s.add(start - task.next_due)
+            try:
+                task.callback()
+            except Exception:
+                self.logger.exception(f"Scheduled task {task.name} failed - cancelling it")
+                self.cancel(task.name)
+                continue
+            end = self.clock.monotonic()
+            task.duration_s.add(end - start)
+
+            with self.cond:
+                if task.cancelled:
+                    continue
+                task.next_due += task.period_s
+                if task.next_due < end:
+                    task.overruns += 1
+                    task.next_due = end
+                self.push(task)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        with self.cond:
+            self.cancel_event.set()
+            self.cond.notify()
+
+    def join(self) -> None:
+        self.thread.join()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.cond:
+            tasks = list(self.tasks.values())
+        return {task.name: task.stats() for task in tasks}
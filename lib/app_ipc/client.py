@@ -1,7 +1,9 @@
 import zmq
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from app_ipc.codec import get_codec, pack_message, unpack_message
 from app_ipc.payloads import RepPayload, ReqPayload
+from app_ipc.telemetry import channel_topic
 
 
 class Client:
@@ -9,10 +11,17 @@ class Client:
         self,
         host: str="127.0.0.1",
         port: str="5555",
+        codec: Optional[str]=None,
     ) -> None:
+        if codec is not None:
+            get_codec(codec)
+        self.codec = codec
         self.context = zmq.Context()
         self.socket = self.context.socket(zmq.REQ)
         self.socket.connect(f"tcp://{host}:{port}")
+        self.host = host
+        self.telemetry = None
+        self.topics: Set[bytes] = set()
 
     def send_request(
         self,
@@ -22,9 +31,51 @@ class Client:
         if args is None:
             args = {}
         req_payload: ReqPayload = {"command": command, "args": args}
-        self.socket.send_string(json.dumps(req_payload))
-        
-        resp = self.socket.recv_string()
-        rep_payload: RepPayload = json.loads(resp)
+        self.socket.send_multipart(pack_message(self.codec, req_payload))
+
+        _, rep_payload = unpack_message(self.socket.recv_multipart())
         return rep_payload
 
+    def send_batch(
+        self,
+        requests: Iterable[Tuple[str, Optional[Dict[str, Any]]]],
+    ) -> RepPayload:
+        return self.send_request("batch", {
+            "requests": [
+                {"command": command, "args": args if args is not None else {}}
+                for command, args in requests
+            ],
+        })
+
+    def subscribe(
+        self,
+        channels: Optional[Iterable[int]]=None,
+        port: str="5556",
+    ) -> None:
+        if self.telemetry is None:
+            self.telemetry = self.context.socket(zmq.SUB)
+            self.telemetry.connect(f"tcp://{self.host}:{port}")
+        topics = [b""] if channels is None else [channel_topic(channel) for channel in channels]
+        for topic in topics:
+            if topic not in self.topics:
+                self.telemetry.setsockopt(zmq.SUBSCRIBE, topic)
+                self.topics.add(topic)
+
+    def unsubscribe(self, channels: Optional[Iterable[int]]=None) -> None:
+        if self.telemetry is None:
+            raise RuntimeError("Call subscribe before unsubscribing from telemetry")
+        # No channels drops every subscription, including per-channel ones
+        topics = list(self.topics) if channels is None else [channel_topic(channel) for channel in channels]
+        for topic in topics:
+            if topic in self.topics:
+                self.telemetry.setsockopt(zmq.UNSUBSCRIBE, topic)
+                self.topics.discard(topic)
+
+    def recv_telemetry(self, timeout_ms: Optional[int]=None) -> Optional[Tuple[int, Dict[str, Any]]]:
+        if self.telemetry is None:
+            raise RuntimeError("Call subscribe before receiving telemetry")
+        if timeout_ms is not None and not self.telemetry.poll(timeout_ms):
+            return None
+        topic, message = self.telemetry.recv_multipart()
+        channel = int(topic.decode().rstrip("/").split("_")[-1])
+        return channel, json.loads(message)
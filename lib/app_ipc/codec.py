@@ -0,0 +1,72 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+
+class Codec(ABC):
+    name = ""
+
+    @abstractmethod
+    def encode(self, payload: Any) -> bytes:
+        raise RuntimeError("Can't call base codec")
+
+    @abstractmethod
+    def decode(self, message: bytes) -> Any:
+        raise RuntimeError("Can't call base codec")
+
+
+class JsonCodec(Codec):
+    name = JSON
+
+    def encode(self, payload: Any) -> bytes:
+        return json.dumps(payload).encode()
+
+    def decode(self, message: bytes) -> Any:
+        return json.loads(message)
+
+
+class MsgpackCodec(Codec):
+    name = MSGPACK
+
+    def __init__(self) -> None:
+        import msgpack
+        self.packer = msgpack.Packer(use_bin_type=True)
+        self.unpackb = msgpack.unpackb
+
+    def encode(self, payload: Any) -> bytes:
+        return self.packer.pack(payload)
+
+    def decode(self, message: bytes) -> Any:
+        return self.unpackb(message, raw=False)
+
+
+CODECS: Dict[str, Codec] = {}
+
+
+def get_codec(name: str) -> Codec:
+    if name not in CODECS:
+        if name == JSON:
+            CODECS[name] = JsonCodec()
+        elif name == MSGPACK:
+            CODECS[name] = MsgpackCodec()
+        else:
+            raise ValueError(f"Unknown codec {name}")
+    return CODECS[name]
+
+
+def pack_message(codec: Optional[str], payload: Any) -> List[bytes]:
+    # A bare single frame is the original JSON format, older clients only send that
+    if codec is None:
+        return [get_codec(JSON).encode(payload)]
+    return [codec.encode(), get_codec(codec).encode(payload)]
+
+
+def unpack_message(frames: List[bytes]) -> Tuple[Optional[str], Any]:
+    if len(frames) == 1:
+        return None, get_codec(JSON).decode(frames[0])
+    codec = frames[0].decode()
+    return codec, get_codec(codec).decode(frames[1])
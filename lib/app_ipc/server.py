@@ -1,10 +1,18 @@
 import zmq
-import json
-from typing import Any
-from threading import Event
+import zmq.asyncio
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, List, Optional
+from threading import Event, Thread
+from config.config import Config
+from app_ipc.codec import pack_message, unpack_message
 from app_ipc.payloads import RepPayload, ReqPayload
 
 
+READ_BACKEND = "inproc://ipc_read"
+CONTROL_BACKEND = "inproc://ipc_control"
+
+
 class Server:
     def __init__(
         self,
@@ -27,6 +35,9 @@ class Server:
             self.shutdown_server()
             return RepPayload(status="ok", payload="Server shutting down")
 
+        if command == "batch":
+            return self.process_batch(args.get("requests", []))
+
         if hasattr(self.obj_instance, command):
             method = getattr(self.obj_instance, command)
             resp_payload: RepPayload = method(**args)
@@ -34,13 +45,215 @@ class Server:
         else:
             return RepPayload(status="error", payload="Invalid command")
 
+    def process_batch(self, requests: List[ReqPayload]) -> RepPayload:
+        if not isinstance(requests, list):
+            return RepPayload(status="error", payload="Batch requests must be a list")
+        replies: List[RepPayload] = []
+        for req_payload in requests:
+            if not isinstance(req_payload, dict):
+                replies.append(RepPayload(status="error", payload="Malformed request in batch"))
+                continue
+            if req_payload.get("command") in ("batch", "shutdown_server"):
+                replies.append(RepPayload(status="error", payload="Command not allowed in a batch"))
+                continue
+            try:
+                replies.append(self.process_request(req_payload))
+            except Exception as e:
+                replies.append(RepPayload(status="error", payload=str(e)))
+        return RepPayload(status="ok", payload=replies)
+
+    def handle_message(self, frames: List[bytes]) -> List[bytes]:
+        # Replies use the codec the request arrived in
+        try:
+            codec, req_payload = unpack_message(frames)
+        except (ValueError, ImportError) as e:
+            return pack_message(None, RepPayload(status="error", payload=f"Malformed request: {e}"))
+        rep_payload: RepPayload = self.process_request(req_payload)
+        return pack_message(codec, rep_payload)
+
     def run(self) -> None:
         while not self.cancel_event.is_set():
-            message = self.socket.recv_string()
-            req_payload: ReqPayload = json.loads(message)
-            rep_payload: RepPayload = self.process_request(req_payload)
-            self.socket.send_string(json.dumps(rep_payload))
+            frames = self.socket.recv_multipart()
+            self.socket.send_multipart(self.handle_message(frames))
 
     def shutdown_server(self) -> None:
         self.cancel_event.set()
 
+
+
+class AsyncServer(Server):
+    def __init__(
+        self,
+        obj_instance: Any,
+        executor: Executor,
+        host: str="127.0.0.1",
+        port: str="5555",
+    ) -> None:
+        self.obj_instance = obj_instance
+        self.executor = executor
+        self.context = zmq.asyncio.Context()
+        self.socket = self.context.socket(zmq.REP)
+        self.socket.bind(f"tcp://{host}:{port}")
+
+        self.cancel_event = Event()
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self.cancel_event.is_set():
+            frames = await self.socket.recv_multipart()
+            reply = await loop.run_in_executor(
+                self.executor,
+                self.handle_message,
+                frames,
+            )
+            await self.socket.send_multipart(reply)
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
+
+
+class RouterServer(Server):
+    def __init__(
+        self,
+        obj_instance: Any,
+        host: str="127.0.0.1",
+        port: str="5555",
+        read_workers: int=4,
+        control_workers: int=1,
+        poll_ms: int=100,
+    ) -> None:
+        self.obj_instance = obj_instance
+        self.poll_ms = poll_ms
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.ROUTER)
+        self.socket.bind(f"tcp://{host}:{port}")
+
+        # Read-only queries and control commands get separate pools so a
+        # slow shutdown_channel never queues dashboard polls behind it
+        self.read_backend = self.context.socket(zmq.DEALER)
+        self.read_backend.bind(READ_BACKEND)
+        self.control_backend = self.context.socket(zmq.DEALER)
+        self.control_backend.bind(CONTROL_BACKEND)
+
+        self.cancel_event = Event()
+        self.dropped = 0
+        self.workers: List[Thread] = [
+            Thread(target=self.work, args=(READ_BACKEND,), name=f"ipc_read_{idx}")
+            for idx in range(read_workers)
+        ] + [
+            Thread(target=self.work, args=(CONTROL_BACKEND,), name=f"ipc_control_{idx}")
+            for idx in range(control_workers)
+        ]
+
+    @staticmethod
+    def is_read_only(req_payload: ReqPayload) -> bool:
+        # Anything malformed goes to the control workers, which reply with the error
+        if not isinstance(req_payload, dict):
+            return False
+        command = req_payload.get("command", "")
+        if not isinstance(command, str):
+            return False
+        if command == "batch":
+            args = req_payload.get("args", {})
+            if not isinstance(args, dict):
+                return False
+            requests = args.get("requests", [])
+            return isinstance(requests, list) and all(
+                RouterServer.is_read_only(req) and req.get("command") != "batch"
+                for req in requests
+            )
+        return command.startswith("get_")
+
+    def work(self, backend: str) -> None:
+        socket = self.context.socket(zmq.REP)
+        socket.connect(backend)
+        try:
+            while not self.cancel_event.is_set():
+                if not socket.poll(self.poll_ms):
+                    continue
+                frames = socket.recv_multipart()
+                try:
+                    reply = self.handle_message(frames)
+                except Exception as e:
+                    reply = pack_message(
+                        unpack_message(frames)[0],
+                        RepPayload(status="error", payload=str(e)),
+                    )
+                socket.send_multipart(reply)
+        finally:
+            socket.close(linger=0)
+
+    def route(self, frames: List[bytes]) -> None:
+        if b"" not in frames:
+            # No REQ envelope (e.g. a bare DEALER), so there is nowhere valid to send a reply
+            self.dropped += 1
+            return
+        split = frames.index(b"") + 1
+        envelope, body = frames[:split], frames[split:]
+        try:
+            codec, req_payload = unpack_message(body)
+            command = req_payload.get("command", "")
+            read_only = self.is_read_only(req_payload)
+        except (ValueError, ImportError, AttributeError) as e:
+            self.socket.send_multipart(envelope + pack_message(
+                None,
+                RepPayload(status="error", payload=f"Malformed request: {e}"),
+            ))
+            return
+        if command == "shutdown_server":
+            # Answered here so the reply can't be stranded in a worker after the loop exits
+            self.shutdown_server()
+            self.socket.send_multipart(envelope + pack_message(
+                codec,
+                RepPayload(status="ok", payload="Server shutting down"),
+            ))
+            return
+        if read_only:
+            self.read_backend.send_multipart(frames)
+        else:
+            self.control_backend.send_multipart(frames)
+
+    def run(self) -> None:
+        for worker in self.workers:
+            worker.start()
+
+        poller = zmq.Poller()
+        poller.register(self.socket, zmq.POLLIN)
+        poller.register(self.read_backend, zmq.POLLIN)
+        poller.register(self.control_backend, zmq.POLLIN)
+        while not self.cancel_event.is_set():
+            events = dict(poller.poll(self.poll_ms))
+            if self.socket in events:
+                self.route(self.socket.recv_multipart())
+            for backend in (self.read_backend, self.control_backend):
+                if backend in events:
+                    self.socket.send_multipart(backend.recv_multipart())
+
+        for worker in self.workers:
+            worker.join()
+        for socket in (self.socket, self.read_backend, self.control_backend):
+            socket.close(linger=0)
+
+
+def CreateServer(
+    config: Config,
+    obj_instance: Any,
+    executor: Optional[Executor]=None,
+) -> Server:
+    host = config.get("host", "127.0.0.1")
+    port = str(config.get("port", "5555"))
+    if executor is not None:
+        return AsyncServer(obj_instance, executor, host, port)
+
+    mode = config.get("mode", "rep")
+    if mode == "rep":
+        return Server(obj_instance, host, port)
+    if mode == "router":
+        return RouterServer(
+            obj_instance,
+            host,
+            port,
+            read_workers=config.get("read_workers", 4),
+            control_workers=config.get("control_workers", 1),
+        )
+    raise ValueError(f"Unknown IPC server mode {mode}")
@@ -0,0 +1,47 @@
+import zmq
+import json
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from config.config import Config
+
+
+def channel_topic(channel: int) -> bytes:
+    # Trailing delimiter keeps channel_1 subscribers from matching channel_10
+    return f"channel_{channel}/".encode()
+
+
+class TelemetryPublisher:
+    def __init__(
+        self,
+        host: str="127.0.0.1",
+        port: str="5556",
+        hwm: int=1000,
+    ) -> None:
+        self.context = zmq.Context.instance()
+        self.socket = self.context.socket(zmq.PUB)
+        self.socket.setsockopt(zmq.SNDHWM, hwm)
+        self.socket.bind(f"tcp://{host}:{port}")
+        self.mtx = Lock()
+        self.published = 0
+
+    def publish(self, channel: int, sample: Dict[str, Any]) -> None:
+        message = json.dumps(sample).encode()
+        with self.mtx:
+            self.socket.send_multipart([channel_topic(channel), message])
+            self.published += 1
+
+    def close(self) -> None:
+        with self.mtx:
+            self.socket.close(linger=0)
+
+
+def CreateTelemetryPublisher(config: "Config") -> Optional[TelemetryPublisher]:
+    if not config.get("telemetry", False):
+        return None
+    return TelemetryPublisher(
+        host=config.get("host", "127.0.0.1"),
+        port=str(config.get("telemetry_port", "5556")),
+        hwm=config.get("telemetry_hwm", 1000),
+    )
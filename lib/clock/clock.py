@@ -0,0 +1,165 @@
+import time
+import datetime
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from config.recursive_namespace import RecursiveNamespace
+
+
+class Clock(ABC):
+    @abstractmethod
+    def time(self) -> float:
+        raise RuntimeError("Can't call base clock")
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        raise RuntimeError("Can't call base clock")
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        raise RuntimeError("Can't call base clock")
+
+    @abstractmethod
+    def to_real_s(self, seconds: float) -> float:
+        raise RuntimeError("Can't call base clock")
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time())
+
+    def wait(
+        self,
+        cond: threading.Condition,
+        timeout: Optional[float]=None,
+    ) -> None:
+        cond.wait(None if timeout is None else self.to_real_s(timeout))
+
+    @contextmanager
+    def attach(self) -> Iterator[None]:
+        yield
+
+
+class SystemClock(Clock):
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def to_real_s(self, seconds: float) -> float:
+        return seconds
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+
+class ScaledClock(Clock):
+    def __init__(
+        self,
+        time_scale: float,
+    ) -> None:
+        self.time_scale = time_scale
+        self.start_time = time.time()
+        self.start_monotonic = time.monotonic()
+
+    def elapsed(self) -> float:
+        return (time.monotonic() - self.start_monotonic) * self.time_scale
+
+    def time(self) -> float:
+        return self.start_time + self.elapsed()
+
+    def monotonic(self) -> float:
+        return self.start_monotonic + self.elapsed()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(self.to_real_s(seconds))
+
+    def to_real_s(self, seconds: float) -> float:
+        return seconds / self.time_scale
+
+
+class VirtualClock(Clock):
+    def __init__(
+        self,
+        idle_timeout_s: float=0.05,
+    ) -> None:
+        self.idle_timeout_s = idle_timeout_s
+        self.start_time = time.time()
+        self.elapsed = 0.0
+        self.participants = 0
+        self.deadlines: List[float] = []
+        self.cond = threading.Condition()
+
+    def time(self) -> float:
+        return self.start_time + self.elapsed
+
+    def monotonic(self) -> float:
+        return self.elapsed
+
+    def to_real_s(self, seconds: float) -> float:
+        raise RuntimeError("Virtual time has no real time equivalent")
+
+    def advance(self, force: bool=False) -> None:
+        if not self.deadlines:
+            return
+        if not force and len(self.deadlines) < self.participants:
+            return
+        self.elapsed = max(self.elapsed, min(self.deadlines))
+        self.cond.notify_all()
+
+    def sleep(self, seconds: float) -> None:
+        with self.cond:
+            deadline = self.elapsed + max(seconds, 0.0)
+            self.deadlines.append(deadline)
+            try:
+                self.advance()
+                while self.elapsed < deadline:
+                    # A participant blocked on something other than the clock
+                    # would stall time forever, so fall back to advancing
+                    # after a short real-time idle period
+                    if not self.cond.wait(self.idle_timeout_s):
+                        self.advance(force=True)
+            finally:
+                self.deadlines.remove(deadline)
+
+    def wait(
+        self,
+        cond: threading.Condition,
+        timeout: Optional[float]=None,
+    ) -> None:
+        if timeout is None:
+            cond.wait()
+            return
+        cond.release()
+        try:
+            self.sleep(timeout)
+        finally:
+            cond.acquire()
+
+    @contextmanager
+    def attach(self) -> Iterator[None]:
+        with self.cond:
+            self.participants += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.participants -= 1
+                self.advance()
+
+
+def CreateClock(config: Optional[RecursiveNamespace]) -> Clock:
+    if config is None:
+        return SystemClock()
+    clock_type = config.get("type", "system")
+    if clock_type == "system":
+        return SystemClock()
+    if clock_type == "scaled":
+        return ScaledClock(config.get("time_scale", 1.0))
+    if clock_type == "virtual":
+        return VirtualClock(config.get("idle_timeout_s", 0.05))
+    raise ValueError(f"Unknown clock type {clock_type}")
@@ -1,8 +1,11 @@
 import os
+import queue
+import atexit
 import logging
 import datetime
-from typing import Optional
-from logging import Logger, LogRecord, handlers
+import itertools
+from typing import Dict, List, Optional
+from logging import Handler, Logger, LogRecord, handlers
 from config.recursive_namespace import RecursiveNamespace
 
 
@@ -22,8 +25,24 @@ class MyFormatter(logging.Formatter):
         return s
 
 
+class DroppingQueueHandler(handlers.QueueHandler):
+    def __init__(self, queue: "queue.Queue[LogRecord]") -> None:
+        super().__init__(queue)
+        self.drop_counter = itertools.count()
+        self.dropped = 0
+
+    def enqueue(self, record: LogRecord) -> None:
+        # Never block the logging thread on a full queue, count the loss instead
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped = next(self.drop_counter) + 1
+
+
 class LoggerManager:
     logger = None
+    listener = None
+    queue_handler = None
     name = "log"
 
     def __init__(self) -> None:
@@ -42,6 +61,21 @@ class LoggerManager:
         cls.logger = cls._create_logger(config)
         return cls.logger
 
+    @classmethod
+    def stop(cls) -> None:
+        if cls.listener is not None:
+            cls.listener.stop()
+            cls.listener = None
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        if cls.queue_handler is None:
+            return {"queued": 0, "dropped": 0}
+        return {
+            "queued": cls.queue_handler.queue.qsize(),
+            "dropped": cls.queue_handler.dropped,
+        }
+
     @classmethod
     def get_path(
         cls,
@@ -55,8 +89,8 @@ class LoggerManager:
         path = os.path.join(config.directory, file_name)
         return path
 
-    @staticmethod
-    def _create_logger(config: RecursiveNamespace) -> Logger:
+    @classmethod
+    def _create_logger(cls, config: RecursiveNamespace) -> Logger:
         name = config.name
         level = config.level
         format = config.format
@@ -68,6 +102,7 @@ class LoggerManager:
         logger.setLevel(level)
 
         formatter = MyFormatter(format)
+        output_handles: List[Handler] = []
 
         rotate_handle = handlers.TimedRotatingFileHandler(
             path,
@@ -76,13 +111,29 @@ class LoggerManager:
         rotate_handle.setLevel(level)
         rotate_handle.setFormatter(formatter)
         rotate_handle.suffix = suffix
-        logger.addHandler(rotate_handle)
+        output_handles.append(rotate_handle)
 
         if not log_only:
             print_handle = logging.StreamHandler()
             print_handle.setLevel(level)
             print_handle.setFormatter(formatter)
-            logger.addHandler(print_handle)
-
+            output_handles.append(print_handle)
+
+        if not config.get("queue", False):
+            for handle in output_handles:
+                logger.addHandler(handle)
+            return logger
+
+        # Callers only enqueue; file and console writes happen on the listener thread
+        cls.queue_handler = DroppingQueueHandler(queue.Queue(config.get("queue_size", 10000)))
+        cls.queue_handler.setLevel(level)
+        logger.addHandler(cls.queue_handler)
+        cls.listener = handlers.QueueListener(
+            cls.queue_handler.queue,
+            *output_handles,
+            respect_handler_level=True,
+        )
+        cls.listener.start()
+        atexit.register(cls.stop)
         return logger
 
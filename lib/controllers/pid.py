@@ -1,6 +1,6 @@
-import time
 from typing import cast, Optional
 
+from clock.clock import Clock, SystemClock
 from config.logger_manager import LoggerManager
 from controllers.controller import (
     BaseController,
@@ -22,8 +22,10 @@ class PIDController(BaseController[InputType, OutputType, TimeType]):
         p_limits: Optional[Limits[OutputType]]=None,
         i_limits: Optional[Limits[OutputType]]=None,
         d_limits: Optional[Limits[OutputType]]=None,
+        clock: Optional[Clock]=None,
     ) -> None:
         self.logger = logger
+        self.clock = clock if clock is not None else SystemClock()
         self.kp = kp
         self.ki = ki
         self.kd = kd
@@ -54,7 +56,7 @@ class PIDController(BaseController[InputType, OutputType, TimeType]):
         t: Optional[TimeType] = None,
     ) -> OutputType:
         if t is None:
-            t = cast(TimeType, time.monotonic())
+            t = cast(TimeType, self.clock.monotonic())
         error = cast(InputType, setpoint - value)
 
         if self.last_error is None or self.last_time is None:
@@ -0,0 +1,134 @@
+from typing import Optional, Sequence, Union
+import numpy as np
+
+from clock.clock import Clock, SystemClock
+from config.logger_manager import LoggerManager
+from controllers.controller import BaseController, Limits
+
+
+Gains = Union[float, Sequence[float], np.ndarray]
+VectorLimits = Optional[Union[Limits[float], Sequence[Optional[Limits[float]]], np.ndarray]]
+
+
+class VectorPIDController(BaseController[np.ndarray, np.ndarray, float]):
+    def __init__(
+        self,
+        logger: LoggerManager,
+        channels: int,
+        kp: Gains,
+        ki: Gains,
+        kd: Gains,
+        output_limits: VectorLimits,
+        p_limits: VectorLimits=None,
+        i_limits: VectorLimits=None,
+        d_limits: VectorLimits=None,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.logger = logger
+        self.clock = clock if clock is not None else SystemClock()
+        self.channels = channels
+        self.kp = self.gains(kp)
+        self.ki = self.gains(ki)
+        self.kd = self.gains(kd)
+        self.output_limits = self.limits(output_limits)
+        self.p_limits = self.limits(p_limits)
+        self.i_limits = self.limits(i_limits)
+        self.d_limits = self.limits(d_limits)
+        self.set_integral_limits()
+        self.reset()
+
+    def set_integral_limits(self) -> None:
+        self.integral_limits = self.limits(None)
+        windup = self.ki > 0.0
+        self.integral_limits[windup] = self.i_limits[windup] / self.ki[windup, None]
+
+    def set_kp(self, kp: Gains) -> None:
+        self.kp = self.gains(kp)
+
+    def set_ki(self, ki: Gains) -> None:
+        self.ki = self.gains(ki)
+        self.set_integral_limits()
+
+    def set_kd(self, kd: Gains) -> None:
+        self.kd = self.gains(kd)
+
+    def gains(self, gains: Gains) -> np.ndarray:
+        return np.broadcast_to(np.asarray(gains, dtype=np.float64), (self.channels,)).copy()
+
+    def limits(self, limits: VectorLimits) -> np.ndarray:
+        # (channels, 2) array of [low, high]; None anywhere means unbounded
+        bounds = np.empty((self.channels, 2))
+        bounds[:, 0] = -np.inf
+        bounds[:, 1] = np.inf
+        if limits is None:
+            return bounds
+        if isinstance(limits, np.ndarray) or not any(
+            limit is None or isinstance(limit, (list, tuple, np.ndarray)) for limit in limits
+        ):
+            bounds[:] = np.asarray(limits, dtype=np.float64)
+            return bounds
+        for idx, limit in enumerate(limits):
+            if limit is not None:
+                bounds[idx] = limit
+        return bounds
+
+    def reset(self, mask: Optional[np.ndarray]=None) -> None:
+        if mask is None:
+            self.last_error = np.zeros(self.channels)
+            self.last_time = np.full(self.channels, np.nan)
+            self.integrated_error = np.zeros(self.channels)
+            self.output = np.zeros(self.channels)
+            return
+        self.last_error[mask] = 0.0
+        self.last_time[mask] = np.nan
+        self.integrated_error[mask] = 0.0
+        self.output[mask] = 0.0
+
+    def __call__(
+        self,
+        value: np.ndarray,
+        setpoint: np.ndarray,
+        t: Optional[float]=None,
+        mask: Optional[np.ndarray]=None,
+    ) -> np.ndarray:
+        if t is None:
+            t = self.clock.monotonic()
+        error = setpoint - value
+        # Channels outside the mask, or with no setpoint, keep their state and last output
+        active = setpoint == setpoint
+        if mask is not None:
+            active &= mask
+
+        # First call on a channel has a NaN last_time, which fails dt > 0 like a stale tick
+        dt = t - self.last_time
+        valid = dt > 0.0
+        if (active & (dt <= 0.0)).any():
+            self.logger.warning("Time delta is nonpositive, setting dedt to 0")
+        dt = np.where(valid, dt, 0.0)
+        inv_dt = np.divide(1.0, dt, out=np.zeros(self.channels), where=valid)
+        dedt = (error - self.last_error) * inv_dt
+
+        # Anti-windup: hold the integrator where ki * integral sits on i_limits
+        integrated_error = np.minimum(
+            np.maximum(self.integrated_error + error * dt, self.integral_limits[:, 0]),
+            self.integral_limits[:, 1],
+        )
+
+        output = (
+            np.minimum(np.maximum(error * self.kp, self.p_limits[:, 0]), self.p_limits[:, 1])
+            + np.minimum(np.maximum(integrated_error * self.ki, self.i_limits[:, 0]), self.i_limits[:, 1])
+            + np.minimum(np.maximum(dedt * self.kd, self.d_limits[:, 0]), self.d_limits[:, 1])
+        )
+        output = np.minimum(np.maximum(output, self.output_limits[:, 0]), self.output_limits[:, 1])
+
+        if active.all():
+            self.integrated_error = integrated_error
+            self.last_error = error
+            self.last_time[:] = t
+            self.output = output
+            return output.copy()
+        np.copyto(self.integrated_error, integrated_error, where=active)
+        np.copyto(self.last_error, error, where=active)
+        np.copyto(self.last_time, t, where=active)
+        np.copyto(self.output, output, where=active)
+        return self.output.copy()
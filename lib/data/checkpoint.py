@@ -0,0 +1,80 @@
+import os
+import struct
+import threading
+import zlib
+from typing import NamedTuple, Optional
+
+
+CHECKPOINT_MAGIC = b"HCCP"
+CHECKPOINT_VERSION = 1
+# magic, version, channel, cycle_no, heating state, timestamp, then a crc32 of all of it
+CHECKPOINT = struct.Struct("<4sHHIBd")
+CHECKPOINT_CRC = struct.Struct("<I")
+
+
+class Checkpoint(NamedTuple):
+    cycle_no: int
+    heating_state: int
+    timestamp: float
+
+
+class CheckpointStore:
+    def __init__(self, directory: str, sync: bool=True) -> None:
+        self.directory = directory
+        self.sync = sync
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, channel: int) -> str:
+        return os.path.join(self.directory, f"channel_{channel}.ckpt")
+
+    @staticmethod
+    def encode(channel: int, checkpoint: Checkpoint) -> bytes:
+        body = CHECKPOINT.pack(
+            CHECKPOINT_MAGIC,
+            CHECKPOINT_VERSION,
+            channel,
+            checkpoint.cycle_no,
+            checkpoint.heating_state,
+            checkpoint.timestamp,
+        )
+        return body + CHECKPOINT_CRC.pack(zlib.crc32(body))
+
+    @staticmethod
+    def decode(channel: int, data: bytes) -> Checkpoint:
+        if len(data) != CHECKPOINT.size + CHECKPOINT_CRC.size:
+            raise ValueError(f"Checkpoint is {len(data)} bytes, expected {CHECKPOINT.size + CHECKPOINT_CRC.size}")
+        body = data[:CHECKPOINT.size]
+        (crc,) = CHECKPOINT_CRC.unpack(data[CHECKPOINT.size:])
+        if zlib.crc32(body) != crc:
+            raise ValueError("Checkpoint checksum mismatch")
+        magic, version, stored_channel, cycle_no, heating_state, timestamp = CHECKPOINT.unpack(body)
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError(f"Unknown checkpoint format {magic!r} v{version}")
+        if stored_channel != channel:
+            raise ValueError(f"Checkpoint belongs to channel {stored_channel}")
+        return Checkpoint(cycle_no, heating_state, timestamp)
+
+    def save(self, channel: int, checkpoint: Checkpoint) -> None:
+        # Write a private temp file then rename over the old one, so a crash
+        # leaves either the previous checkpoint or the new one, never a mix
+        path = self.path(channel)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.encode(channel, checkpoint))
+            if self.sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        if self.sync:
+            fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def load(self, channel: int) -> Optional[Checkpoint]:
+        path = self.path(channel)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return self.decode(channel, f.read())
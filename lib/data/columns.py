@@ -0,0 +1,113 @@
+import datetime
+from typing import Any, Dict, Iterable, List, Mapping
+import numpy as np
+
+
+class ColumnBuffer:
+    def __init__(
+        self,
+        headers: Iterable[str],
+        chunk_rows: int=1024,
+    ) -> None:
+        self.headers: List[str] = list(headers)
+        self.chunk_rows = chunk_rows
+        self.columns: Dict[str, np.ndarray] = {
+            header: np.empty(0, dtype=object) for header in self.headers
+        }
+        self.capacity = 0
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    @staticmethod
+    def infer_dtype(value: Any) -> np.dtype:
+        if isinstance(value, (bool, np.bool_)):
+            return np.dtype(object)
+        if isinstance(value, (int, np.integer)):
+            return np.dtype(np.int64)
+        if isinstance(value, (float, np.floating)):
+            return np.dtype(np.float64)
+        if isinstance(value, (datetime.datetime, np.datetime64)):
+            return np.dtype("datetime64[us]")
+        return np.dtype(object)
+
+    @staticmethod
+    def fits(column: np.ndarray, value: Any) -> bool:
+        kind = column.dtype.kind
+        if kind == "O":
+            return True
+        if kind == "i":
+            return isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_))
+        if kind == "f":
+            return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+        if kind == "M":
+            return isinstance(value, (datetime.datetime, np.datetime64))
+        return False
+
+    def promote(self, header: str, value: Any) -> None:
+        column = self.columns[header]
+        if self.length == 0:
+            dtype = self.infer_dtype(value)
+        elif column.dtype.kind == "i" and self.infer_dtype(value).kind == "f":
+            dtype = np.dtype(np.float64)
+        else:
+            dtype = np.dtype(object)
+        promoted = np.empty(self.capacity, dtype=dtype)
+        if dtype.kind == "O" and column.dtype.kind == "M":
+            promoted[:self.length] = column[:self.length].astype(datetime.datetime)
+        else:
+            promoted[:self.length] = column[:self.length]
+        self.columns[header] = promoted
+
+    def reserve(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        capacity = max(self.capacity, self.chunk_rows)
+        while capacity < rows:
+            capacity *= 2
+        for header, column in self.columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.length] = column[:self.length]
+            self.columns[header] = grown
+        self.capacity = capacity
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        if self.length == self.capacity:
+            self.reserve(self.length + 1)
+        idx = self.length
+        for header in self.headers:
+            value = row.get(header)
+            column = self.columns[header]
+            if self.length == 0 or not self.fits(column, value):
+                self.promote(header, value)
+                column = self.columns[header]
+            column[idx] = value
+        self.length += 1
+
+    def extend(self, columns: Mapping[str, np.ndarray]) -> None:
+        rows = len(next(iter(columns.values()))) if columns else 0
+        if rows == 0:
+            return
+        start = self.length
+        self.reserve(start + rows)
+        for header in self.headers:
+            values = np.asarray(columns[header])
+            column = self.columns[header]
+            if start == 0:
+                column = np.empty(self.capacity, dtype=values.dtype)
+            elif column.dtype != values.dtype:
+                dtype = np.result_type(column.dtype, values.dtype)
+                column = column.astype(dtype)
+            column[start:start + rows] = values
+            self.columns[header] = column
+        self.length += rows
+
+    def column(self, header: str) -> np.ndarray:
+        return self.columns[header][:self.length]
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        return {header: self.column(header) for header in self.headers}
+
+    def clear(self) -> None:
+        self.length = 0
@@ -1,7 +1,13 @@
 import os
 from collections import namedtuple
-from typing import List
-import pandas as pd
+from typing import TYPE_CHECKING, List, Optional
+import numpy as np
+
+from data.columns import ColumnBuffer
+from data.writers import CsvAppendWriter
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class Frame:
@@ -10,30 +16,113 @@ class Frame:
         name: str,
         headers: List[str],
         path: str,
+        chunk_rows: int=1024,
+        stream: bool=False,
+        flush_rows: int=60,
     ) -> None:
         self.name = name
         self.headers = headers
         self.path = path
-        self.df = pd.DataFrame(columns=self.headers)
-        
+        self.chunk_rows = chunk_rows
+        self.buffer = ColumnBuffer(self.headers, chunk_rows)
+        self._df: Optional["pd.DataFrame"] = None
+
+        self.writer = CsvAppendWriter(self.headers) if stream else None
+        self.flush_rows = flush_rows
+        self.written = 0
+
         self.full_path = ""
 
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def df(self) -> "pd.DataFrame":
+        if self._df is None:
+            self._df = self.to_dataframe()
+        return self._df
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        # pandas takes seconds to import on a Pi; only pay for it when a frame is actually needed
+        import pandas as pd
+        if len(self.buffer) == 0:
+            return pd.DataFrame(columns=self.headers)
+        return pd.DataFrame(self.buffer.to_dict(), columns=self.headers)
+
+    def column(self, header: str) -> np.ndarray:
+        return self.buffer.column(header)
+
     def add_row(self, data: namedtuple) -> None:
-        tmp_df = pd.DataFrame([data._asdict()])
-        self.df = pd.concat([self.df, tmp_df], axis=0, ignore_index=True)
+        self.buffer.append(data._asdict())
+        self._df = None
+        if self.writer is not None and len(self.buffer) - self.written >= self.flush_rows:
+            self.flush()
 
     def load(self) -> None:
-        if os.path.exists(self.full_path):
-            self.df = pd.read_csv(self.full_path)
-        else:
-            self.df = self.df
+        if not os.path.exists(self.full_path):
+            return
+        import pandas as pd
+        df = pd.read_csv(self.full_path, index_col=0)
+        missing = [header for header in self.headers if header not in df.columns]
+        if missing:
+            raise ValueError(f"{self.full_path} is missing columns {missing}")
+        self.buffer.clear()
+        self.buffer.extend({header: df[header].to_numpy() for header in self.headers})
+        self._df = None
+        self.written = len(self.buffer)
+
+    def flush(self, sync: bool=True) -> None:
+        if self.writer is None:
+            return
+        if self.writer.path != self.full_path:
+            if not self.writer.open(self.full_path, append=self.written > 0):
+                self.written = 0
+        self.writer.write_rows(self.buffer, self.written, len(self.buffer))
+        self.written = len(self.buffer)
+        self.writer.flush(sync)
 
     def save(self) -> None:
+        if self.writer is not None:
+            self.flush()
+            return
         self.df.to_csv(self.full_path, index=True)
 
     def reset(self) -> None:
-        self.df = pd.DataFrame(columns=self.headers)
+        self.buffer.clear()
+        self._df = None
+        self.written = 0
+        if self.writer is not None:
+            self.writer.close()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.flush()
+            self.writer.close()
+
+    def detach(self) -> "Frame":
+        # Hands the current rows, file and writer to a new Frame and starts
+        # this one empty, so the old cycle can be saved from another thread
+        snapshot = Frame(
+            self.name,
+            self.headers,
+            self.path,
+            self.chunk_rows,
+            stream=False,
+            flush_rows=self.flush_rows,
+        )
+        snapshot.buffer = self.buffer
+        snapshot.writer = self.writer
+        snapshot.written = self.written
+        snapshot.full_path = self.full_path
+        snapshot._df = self._df
+
+        self.buffer = ColumnBuffer(self.headers, self.chunk_rows)
+        self.writer = CsvAppendWriter(self.headers) if snapshot.writer is not None else None
+        self.written = 0
+        self._df = None
+        return snapshot
 
     def set_filename(self, suffix: str) -> None:
         self.full_path = self.path + suffix + ".csv"
-
+        if self.writer is not None and self.writer.path != self.full_path:
+            self.writer.close()
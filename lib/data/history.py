@@ -0,0 +1,286 @@
+import os
+import re
+import json
+import bisect
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+CYCLE_FILE = re.compile(r"cycle_(\d+)\.csv$")
+TIMESTAMP = "timestamp"
+
+
+def normalize_time(value: Any) -> str:
+    # Live samples are numpy datetimes ("T" separator) and rebuilt ones CSV strings (space),
+    # so every index timestamp goes through one fixed form
+    return str(np.datetime64(value, "us"))
+
+
+def format_times(values: Any) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[us]").astype(str)
+
+
+def json_floats(values: Any) -> List[Optional[float]]:
+    # Empty buckets come out as inf/NaN, which JSON can't carry
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def summarize(cycle: int, file: str, columns: Mapping[str, np.ndarray]) -> Dict[str, Any]:
+    timestamps = columns[TIMESTAMP]
+    entry: Dict[str, Any] = {
+        "cycle": cycle,
+        "file": file,
+        "rows": len(timestamps),
+        "t_start": normalize_time(timestamps[0]) if len(timestamps) else None,
+        "t_end": normalize_time(timestamps[-1]) if len(timestamps) else None,
+        "stats": {},
+    }
+    for header, values in columns.items():
+        if header == TIMESTAMP:
+            continue
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            continue
+        entry["stats"][header] = {
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "sum": float(values.sum()),
+            "count": int(len(values)),
+        }
+    return entry
+
+
+def bucket_bounds(rows: int, buckets: int) -> np.ndarray:
+    return np.unique(np.linspace(0, rows, min(buckets, rows) + 1).astype(np.intp))[:-1]
+
+
+class CycleIndex:
+    def __init__(self, cycle_path: str, index_name: str="index.jsonl") -> None:
+        self.cycle_path = cycle_path
+        self.index_path = os.path.join(cycle_path, index_name)
+        self.entries: List[Dict[str, Any]] = []
+        self.cycles: List[int] = []
+        self.mtx = Lock()
+
+    def load(self) -> None:
+        with self.mtx:
+            if not os.path.exists(self.index_path):
+                self.rebuild()
+                return
+            by_cycle: Dict[int, Dict[str, Any]] = {}
+            with open(self.index_path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry["rows"]:
+                            entry["t_start"] = normalize_time(entry["t_start"])
+                            entry["t_end"] = normalize_time(entry["t_end"])
+                        by_cycle[entry["cycle"]] = entry
+            self.set_entries(by_cycle)
+
+    def rebuild(self) -> None:
+        by_cycle: Dict[int, Dict[str, Any]] = {}
+        if os.path.isdir(self.cycle_path):
+            for file in os.listdir(self.cycle_path):
+                match = CYCLE_FILE.match(file)
+                if match is None:
+                    continue
+                import pandas as pd
+                df = pd.read_csv(os.path.join(self.cycle_path, file), index_col=0)
+                if TIMESTAMP not in df.columns:
+                    continue
+                columns = {header: df[header].to_numpy() for header in df.columns}
+                by_cycle[int(match.group(1))] = summarize(int(match.group(1)), file, columns)
+        self.set_entries(by_cycle)
+        if os.path.isdir(self.cycle_path):
+            with open(self.index_path, "w") as f:
+                for entry in self.entries:
+                    f.write(json.dumps(entry) + "\n")
+
+    def set_entries(self, by_cycle: Dict[int, Dict[str, Any]]) -> None:
+        self.cycles = sorted(by_cycle)
+        self.entries = [by_cycle[cycle] for cycle in self.cycles]
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        with self.mtx:
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            idx = bisect.bisect_left(self.cycles, entry["cycle"])
+            if idx < len(self.cycles) and self.cycles[idx] == entry["cycle"]:
+                self.entries[idx] = entry
+            else:
+                self.cycles.insert(idx, entry["cycle"])
+                self.entries.insert(idx, entry)
+
+    def select(
+        self,
+        start_cycle: Optional[int]=None,
+        end_cycle: Optional[int]=None,
+        start_time: Optional["pd.Timestamp"]=None,
+        end_time: Optional["pd.Timestamp"]=None,
+    ) -> List[Dict[str, Any]]:
+        t0 = np.datetime64(start_time, "us") if start_time is not None else None
+        t1 = np.datetime64(end_time, "us") if end_time is not None else None
+        with self.mtx:
+            lo = 0 if start_cycle is None else bisect.bisect_left(self.cycles, start_cycle)
+            hi = len(self.cycles) if end_cycle is None else bisect.bisect_right(self.cycles, end_cycle)
+            entries = self.entries[lo:hi]
+        return [
+            entry for entry in entries
+            if entry["rows"]
+            and (t0 is None or np.datetime64(entry["t_end"]) >= t0)
+            and (t1 is None or np.datetime64(entry["t_start"]) <= t1)
+        ]
+
+
+class HistoryStore:
+    def __init__(
+        self,
+        cycle_path: str,
+        headers: List[str],
+        max_rows: int=10000,
+    ) -> None:
+        self.cycle_path = cycle_path
+        self.headers = headers
+        self.max_rows = max_rows
+        self.index = CycleIndex(cycle_path)
+        self.index.load()
+
+    def record(self, cycle: int, file: str, columns: Mapping[str, np.ndarray]) -> None:
+        self.index.add(summarize(cycle, os.path.basename(file), columns))
+
+    def query(
+        self,
+        start_cycle: Optional[int]=None,
+        end_cycle: Optional[int]=None,
+        start_time: Optional[str]=None,
+        end_time: Optional[str]=None,
+        columns: Optional[List[str]]=None,
+        buckets: Optional[int]=None,
+    ) -> Dict[str, Any]:
+        # pandas is only loaded once someone actually asks for history
+        import pandas as pd
+        if columns is None:
+            columns = [header for header in self.headers if header not in (TIMESTAMP, "cycle")]
+        unknown = [header for header in columns if header not in self.headers or header == TIMESTAMP]
+        if unknown:
+            raise ValueError(f"Unknown columns {unknown}")
+        t0 = pd.Timestamp(start_time) if start_time is not None else None
+        t1 = pd.Timestamp(end_time) if end_time is not None else None
+        entries = self.index.select(start_cycle, end_cycle, t0, t1)
+
+        # Coarse overviews come straight from the per-cycle aggregates in the index
+        if buckets is not None and len(entries) >= buckets:
+            return self.bucket_cycles(entries, columns, buckets)
+
+        rows = sum(entry["rows"] for entry in entries)
+        if buckets is None and t0 is None and t1 is None and rows > self.max_rows:
+            raise ValueError(f"Query matches {rows} rows, more than {self.max_rows} - request buckets")
+
+        df = self.read_samples(entries, columns, t0, t1)
+        if buckets is None:
+            if len(df) > self.max_rows:
+                raise ValueError(
+                    f"Query matches {len(df)} rows, more than {self.max_rows} - request buckets"
+                )
+            result: Dict[str, Any] = {
+                "source": "samples",
+                TIMESTAMP: format_times(df[TIMESTAMP]).tolist(),
+                "cycle": df["cycle"].tolist(),
+            }
+            result.update({header: json_floats(df[header]) for header in columns})
+            return result
+        return self.bucket_samples(df, columns, buckets)
+
+    def read_samples(
+        self,
+        entries: List[Dict[str, Any]],
+        columns: List[str],
+        t0: Optional["pd.Timestamp"],
+        t1: Optional["pd.Timestamp"],
+    ) -> "pd.DataFrame":
+        import pandas as pd
+        usecols = list(dict.fromkeys([TIMESTAMP, "cycle"] + columns))
+        frames = [
+            pd.read_csv(os.path.join(self.cycle_path, entry["file"]), usecols=usecols)
+            for entry in entries
+        ]
+        if not frames:
+            return pd.DataFrame(columns=usecols)
+        df = pd.concat(frames, ignore_index=True)
+        df[TIMESTAMP] = pd.to_datetime(df[TIMESTAMP])
+        if t0 is not None:
+            df = df[df[TIMESTAMP] >= t0]
+        if t1 is not None:
+            df = df[df[TIMESTAMP] <= t1]
+        return df.reset_index(drop=True)
+
+    @staticmethod
+    def bucket_cycles(
+        entries: List[Dict[str, Any]],
+        columns: List[str],
+        buckets: int,
+    ) -> Dict[str, Any]:
+        bounds = bucket_bounds(len(entries), buckets)
+        ends = np.append(bounds[1:], len(entries)) - 1
+        result: Dict[str, Any] = {
+            "source": "cycles",
+            "t_start": [entries[idx]["t_start"] for idx in bounds],
+            "t_end": [entries[idx]["t_end"] for idx in ends],
+            "cycle_start": [entries[idx]["cycle"] for idx in bounds],
+            "cycle_end": [entries[idx]["cycle"] for idx in ends],
+        }
+        for header in columns:
+            stats = [entry["stats"].get(header) for entry in entries]
+            mins = np.array([s["min"] if s else np.inf for s in stats])
+            maxs = np.array([s["max"] if s else -np.inf for s in stats])
+            sums = np.array([s["sum"] if s else 0.0 for s in stats])
+            counts = np.array([s["count"] if s else 0 for s in stats])
+            bucket_counts = np.add.reduceat(counts, bounds)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = np.add.reduceat(sums, bounds) / bucket_counts
+            result[header] = {
+                "min": json_floats(np.minimum.reduceat(mins, bounds)),
+                "max": json_floats(np.maximum.reduceat(maxs, bounds)),
+                "mean": json_floats(np.where(bucket_counts > 0, means, np.nan)),
+            }
+        return result
+
+    @staticmethod
+    def bucket_samples(
+        df: "pd.DataFrame",
+        columns: List[str],
+        buckets: int,
+    ) -> Dict[str, Any]:
+        if len(df) == 0:
+            result = {"source": "samples", "t_start": [], "t_end": [], "cycle_start": [], "cycle_end": []}
+            result.update({header: {"min": [], "max": [], "mean": []} for header in columns})
+            return result
+        bounds = bucket_bounds(len(df), buckets)
+        ends = np.append(bounds[1:], len(df)) - 1
+        cycles = df["cycle"].to_numpy()
+        timestamps = format_times(df[TIMESTAMP])
+        result: Dict[str, Any] = {
+            "source": "samples",
+            "t_start": timestamps[bounds].tolist(),
+            "t_end": timestamps[ends].tolist(),
+            "cycle_start": cycles[bounds].tolist(),
+            "cycle_end": cycles[ends].tolist(),
+        }
+        for header in columns:
+            values = df[header].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = np.add.reduceat(np.where(valid, values, 0.0), bounds) / np.add.reduceat(valid, bounds)
+            result[header] = {
+                "min": json_floats(np.fmin.reduceat(values, bounds)),
+                "max": json_floats(np.fmax.reduceat(values, bounds)),
+                "mean": json_floats(means),
+            }
+        return result
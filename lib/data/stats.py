@@ -0,0 +1,116 @@
+import math
+from typing import Any, Dict
+import numpy as np
+
+
+class RunningStats:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = math.nan
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.last = value
+
+    @property
+    def variance(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self, scale: float=1.0) -> Dict[str, float]:
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.mean * scale,
+            "std": self.std * scale,
+            "min": self.min * scale,
+            "max": self.max * scale,
+            "last": self.last * scale,
+        }
+
+
+class WindowStats:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.values = np.zeros(size)
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.head = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        if self.count == self.size:
+            self.total -= self.values[self.head]
+        else:
+            self.count += 1
+        self.values[self.head] = value
+        self.total += value
+        self.head = (self.head + 1) % self.size
+        # Resum once per lap so rounding from the running total can't build up
+        if self.head == 0:
+            self.total = float(self.values[:self.count].sum())
+
+    @property
+    def mean(self) -> float:
+        if self.count == 0:
+            return math.nan
+        return self.total / self.count
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean}
+
+
+class CycleStats:
+    def __init__(self, window: int=150) -> None:
+        self.temps_C = RunningStats()
+        self.therm_L_C = RunningStats()
+        self.therm_R_C = RunningStats()
+        self.duty_cycle = RunningStats()
+        self.ss_temp_C = WindowStats(window)
+        self.ss_pwm = WindowStats(window)
+
+    def reset(self) -> None:
+        for stats in (self.temps_C, self.therm_L_C, self.therm_R_C, self.duty_cycle, self.ss_temp_C, self.ss_pwm):
+            stats.reset()
+
+    def add(self, therm_L_C: float, therm_R_C: float, duty_cycle: float) -> None:
+        self.temps_C.add(therm_L_C)
+        self.temps_C.add(therm_R_C)
+        self.therm_L_C.add(therm_L_C)
+        self.therm_R_C.add(therm_R_C)
+        self.duty_cycle.add(duty_cycle)
+        self.ss_temp_C.add(therm_R_C)
+        self.ss_pwm.add(duty_cycle)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_temp_C": self.temps_C.max if self.temps_C.count else math.nan,
+            "min_temp_C": self.temps_C.min if self.temps_C.count else math.nan,
+            "ss_temp_C": self.ss_temp_C.mean,
+            "ss_pwm": self.ss_pwm.mean,
+            "therm_L_C": self.therm_L_C.to_dict(),
+            "therm_R_C": self.therm_R_C.to_dict(),
+            "duty_cycle": self.duty_cycle.to_dict(),
+        }
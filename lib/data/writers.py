@@ -0,0 +1,72 @@
+import os
+import csv
+import math
+from typing import Any, IO, List, Optional
+
+from data.columns import ColumnBuffer
+
+
+class CsvAppendWriter:
+    def __init__(
+        self,
+        headers: List[str],
+    ) -> None:
+        self.headers = headers
+        self.path: Optional[str] = None
+        self.file: Optional[IO[str]] = None
+        self.writer = None
+
+    @staticmethod
+    def format_value(value: Any) -> Any:
+        if isinstance(value, float) and math.isnan(value):
+            return ""
+        return value
+
+    @staticmethod
+    def read_header(path: str) -> Optional[List[str]]:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        with open(path, newline="") as f:
+            return next(csv.reader(f), None)
+
+    def open(self, path: str, append: bool) -> bool:
+        # Returns whether rows are appended to the existing file; when False the
+        # caller has to write every row it holds
+        self.close()
+        header = [""] + list(self.headers)
+        existing = self.read_header(path)
+        if append and existing is not None and existing != header:
+            # Older layouts (e.g. an extra "Unnamed: 0" column) would shift every
+            # appended value, so keep the original aside and start a normalized file
+            os.replace(path, f"{path}.orig")
+        append = append and existing == header
+        self.file = open(path, "a" if append else "w", newline="")
+        self.writer = csv.writer(self.file, lineterminator="\n")
+        if not append:
+            self.writer.writerow(header)
+        self.path = path
+        return append
+
+    def write_rows(
+        self,
+        buffer: ColumnBuffer,
+        start: int,
+        stop: int,
+    ) -> None:
+        columns = [buffer.column(header)[start:stop].tolist() for header in self.headers]
+        for index, row in zip(range(start, stop), zip(*columns)):
+            self.writer.writerow([index] + [self.format_value(value) for value in row])
+
+    def flush(self, sync: bool=False) -> None:
+        if self.file is None:
+            return
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.writer = None
+        self.path = None
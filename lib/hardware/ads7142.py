@@ -1,6 +1,9 @@
-from typing import Iterable
-from smbus2 import SMBus, i2c_msg
+import struct
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
 from config.logger_manager import LoggerManager
+from hardware.i2c_bus import I2CBus
 
 
 NTC_table = [
@@ -24,6 +27,42 @@ NTC_table = [
     1745, 1821, 1911, 2017, 2148, 2318, 2553,
     2924, 3695, 4466
 ]
+INVALID_READING = -1234
+SAMPLE_BLOCK = struct.Struct(">16H")
+ADC_CODES = 4096
+DEFAULT_THERMISTOR = "default"
+
+THERMISTOR_TABLES: Dict[str, Sequence[int]] = {
+    DEFAULT_THERMISTOR: NTC_table,
+}
+
+
+def register_thermistor(name: str, table: Sequence[int]) -> None:
+    if len(table) != (ADC_CODES >> 5) + 1:
+        raise ValueError(
+            f"Thermistor table {name} has {len(table)} entries, expected {(ADC_CODES >> 5) + 1}"
+        )
+    THERMISTOR_TABLES[name] = list(table)
+    code_table.cache_clear()
+    code_array.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def code_table(thermistor: str=DEFAULT_THERMISTOR) -> Tuple[float, ...]:
+    table = THERMISTOR_TABLES[thermistor]
+    lut = []
+    for code in range(ADC_CODES):
+        p1 = table[code >> 5]
+        p2 = table[(code >> 5) + 1]
+        lut.append(p1 + ((p2 - p1) * (code & 0x001F)) / 32)
+    return tuple(lut)
+
+
+@lru_cache(maxsize=None)
+def code_array(thermistor: str=DEFAULT_THERMISTOR) -> np.ndarray:
+    lut = np.asarray(code_table(thermistor), dtype=np.float64)
+    lut.flags.writeable = False
+    return lut
 
 
 class ADS7142_Reg:
@@ -43,12 +82,17 @@ class ADS7142:
         logger: LoggerManager,
         bus_number: int,
         device_address: int,
+        thermistor: str=DEFAULT_THERMISTOR,
+        bus: Optional[I2CBus]=None,
     ):
         self.logger = logger
-        self.bus = SMBus(bus_number)
+        self.bus = bus if bus is not None else I2CBus(logger, bus_number)
         self.device_address = device_address
+        self.thermistor = thermistor
+        code_table(self.thermistor)
 
         self.configure_device()
+        self.bus.register(self)
         # Read once to get through first "bad" reading
         self.read_thermistor_values()
 
@@ -63,6 +107,7 @@ class ADS7142:
         return p1 + ((p2 - p1) * (val & 0x001F)) / 32
 
     def read_register(self, register_address: int) -> int:
+        from smbus2 import i2c_msg
         write1 = i2c_msg.write(self.device_address, [ADS7142_Reg.READ_ADDRESS, register_address])
         read1 = i2c_msg.read(self.device_address, 1)
         self.bus.i2c_rdwr(write1, read1)
@@ -73,6 +118,7 @@ class ADS7142:
         register_address: int,
         value: int
     ) -> None:
+        from smbus2 import i2c_msg
         write1 = i2c_msg.write(self.device_address, [ADS7142_Reg.WRITE_ADDRESS, register_address, value])
         self.bus.i2c_rdwr(write1)
 
@@ -82,31 +128,61 @@ class ADS7142:
         self.write_register(ADS7142_Reg.DATA_BUFFER_OPMODE, 0b000)
         self.write_register(ADS7142_Reg.DOUT_FORMAT_CFG, 0b010)
 
-    def read_thermistor_values(self) -> Iterable[float]:
-        self.write_register(ADS7142_Reg.ABORT_SEQUENCE, 1);
-        read_data = self.bus.read_i2c_block_data(self.device_address, 0x00, 16*2)
-        data = self.bytes_to_int16(read_data)
-        data_mC = [0, 0]
+    @staticmethod
+    def decode_thermistor_block(
+        read_data: Sequence[int],
+        thermistor: str=DEFAULT_THERMISTOR,
+    ) -> Tuple[List[float], List[int]]:
+        lut = code_table(thermistor)
         counter = [0, 0]
-        accumulate_mC = [0, 0]
-
-        for val in data:
+        accumulate_dC = [0, 0]
+        for val in SAMPLE_BLOCK.unpack(bytes(read_data)):
             if val & 0x0001:
                 idx = 1 if val & 0b1110 else 0
                 counter[idx] += 1
-                accumulate_mC[idx] += self.calculate_temp((val & 0xFFF0) >> 4)
+                accumulate_dC[idx] += lut[val >> 4]
 
-        for idx in range(2):
-            if counter[idx] != 0:
-                accumulate_mC[idx] /= counter[idx]
-                data_mC[idx] = accumulate_mC[idx]
-            else:
-                self.logger.warning(f"ADS7142 channel {idx+1} has no valid readings")
-                data_mC[idx] = -1234
+        data_C = [
+            accumulate_dC[idx] / counter[idx] / 10 if counter[idx] != 0 else INVALID_READING / 10
+            for idx in range(2)
+        ]
+        return data_C, counter
 
+    @staticmethod
+    def decode_thermistor_blocks(
+        blocks: Sequence[Sequence[int]],
+        thermistor: str=DEFAULT_THERMISTOR,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        data = np.frombuffer(b"".join(bytes(block) for block in blocks), dtype=">u2")
+        data = data.reshape(len(blocks), -1).astype(np.intp)
+        temps_dC = code_array(thermistor)[data >> 4]
+
+        # Bin 2 of each block collects invalid samples; bincount sums in sample
+        # order so the averages match the scalar decode exactly.
+        bins = np.where(data & 0x0001, (data & 0b1110) != 0, 2)
+        bins += 3 * np.arange(len(blocks))[:, None]
+        counter = np.bincount(bins.ravel(), minlength=3 * len(blocks)).reshape(-1, 3)[:, :2]
+        accumulate_dC = np.bincount(
+            bins.ravel(),
+            weights=temps_dC.ravel(),
+            minlength=3 * len(blocks),
+        ).reshape(-1, 3)[:, :2]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            data_C = np.where(counter != 0, accumulate_dC / counter / 10, INVALID_READING / 10)
+        return data_C, counter
+
+    def stop_sequence(self) -> None:
+        self.write_register(ADS7142_Reg.ABORT_SEQUENCE, 1)
+
+    def start_sequence(self) -> None:
         self.write_register(ADS7142_Reg.START_SEQUENCE, 1)
-        return [each/10 for each in data_mC]
 
+    def read_block(self) -> List[int]:
+        return self.bus.read_i2c_block_data(self.device_address, 0x00, SAMPLE_BLOCK.size)
+
+    def read_thermistor_values(self) -> Iterable[float]:
+        return self.bus.read(self)
 
 if __name__ == "__main__":
     from config.config import Config
@@ -0,0 +1,135 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from clock.clock import Clock
+from config.config import Config
+from config.logger_manager import LoggerManager
+
+
+class HardwareBackend(ABC):
+    @abstractmethod
+    def configure(self) -> None:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def cleanup(self) -> None:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def create_therms(self, config: Config, channel: int) -> Any:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def create_ssr(self, config: Config, channel: int) -> Any:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def create_fan_controller(self, config: Config, channel: int) -> Any:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def wait_ready(self) -> None:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def bus_stats(self) -> Dict[str, Any]:
+        raise RuntimeError("Can't call base hardware backend")
+
+    @abstractmethod
+    def relay_stats(self) -> Dict[str, Any]:
+        raise RuntimeError("Can't call base hardware backend")
+
+
+class PiBackend(HardwareBackend):
+    def __init__(
+        self,
+        logger: LoggerManager,
+        config: Config,
+        clock: Optional[Clock]=None,
+        pwm: Optional[Config]=None,
+    ) -> None:
+        self.logger = logger
+        self.config = config
+        self.clock = clock
+        self.pwm = pwm if pwm is not None else Config()
+        self.buses = None
+        self.relays = None
+        self.pi = None
+
+    def configure(self) -> None:
+        import RPi.GPIO as gpio
+        from hardware.i2c_bus import I2CBusManager
+        from hardware.rel1101 import RelayManager
+        gpio.setmode(gpio.BCM)
+        if self.pwm.get("driver", "software") == "pigpio":
+            import pigpio
+            self.pi = pigpio.pi()
+            if not self.pi.connected:
+                raise RuntimeError("Could not connect to pigpiod")
+        self.relays = RelayManager(self.logger)
+        self.buses = I2CBusManager(
+            self.logger,
+            sweep_period_s=self.config.get("sweep_period_s", 0.0),
+            clock=self.clock,
+        )
+
+    def cleanup(self) -> None:
+        import RPi.GPIO as gpio
+        gpio.cleanup()
+        if self.buses is not None:
+            self.buses.close()
+        if self.relays is not None:
+            self.relays.close()
+        if self.pi is not None:
+            self.pi.stop()
+
+    def create_therms(self, config: Config, channel: int) -> Any:
+        from hardware.ads7142 import ADS7142, DEFAULT_THERMISTOR
+        return ADS7142(
+            logger=self.logger,
+            bus_number=config.i2c.bus,
+            device_address=config.i2c.add,
+            thermistor=config.i2c.get("thermistor", DEFAULT_THERMISTOR),
+            bus=self.buses.get(config.i2c.bus),
+        )
+
+    def create_ssr(self, config: Config, channel: int) -> Any:
+        from hardware.cpc1706y import CPC1706Y
+        from hardware.pwm import CreatePWM
+        return CPC1706Y(
+            logger=self.logger,
+            pin=config.ssr.pin,
+            freq=config.ssr.freq,
+            pwm=CreatePWM(self.pwm, config.ssr, channel, self.pi),
+            resolution=config.ssr.get("resolution", 1.0),
+        )
+
+    def create_fan_controller(self, config: Config, channel: int) -> Any:
+        return self.relays.hub(config.fan.port, config.fan.timeout)
+
+    def wait_ready(self) -> None:
+        self.relays.wait_attached()
+
+    def bus_stats(self) -> Dict[str, Any]:
+        if self.buses is None:
+            return {}
+        return self.buses.stats()
+
+    def relay_stats(self) -> Dict[str, Any]:
+        if self.relays is None:
+            return {}
+        return self.relays.stats()
+
+
+def CreateBackend(
+    config: Config,
+    logger: LoggerManager,
+    clock: Optional[Clock]=None,
+) -> HardwareBackend:
+    hardware = config.get("hardware", "pi")
+    if hardware == "pi":
+        return PiBackend(logger, config.get("i2c", Config()), clock, config.get("pwm", Config()))
+    if hardware == "sim":
+        from hardware.sim import SimBackend
+        return SimBackend(logger, config.get("sim", Config()), clock)
+    raise ValueError(f"Unknown hardware backend {hardware}")
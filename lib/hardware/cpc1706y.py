@@ -1,5 +1,6 @@
-import RPi.GPIO as gpio
+from typing import Any, Dict, Optional
 from config.logger_manager import LoggerManager
+from hardware.pwm import PWMOutput, SoftwarePWM
 
 
 class CPC1706Y:
@@ -8,24 +9,44 @@ class CPC1706Y:
         logger: LoggerManager,
         pin: int,
         freq: int,
+        pwm: Optional[PWMOutput]=None,
+        resolution: float=1.0,
     ) -> None:
         self.logger = logger
 
         self.pin = pin
         self.freq = freq
-        self.pwm = None
+        self.resolution = resolution
+        self.pwm = pwm
+        self.duty_cycle: Optional[float] = None
+        self.updates = 0
+        self.skipped = 0
 
         self.setup()
 
     def setup(self) -> None:
         self.logger.info(f"Configuring PWM on GPIO {self.pin} at {self.freq} Hz")
-        gpio.setup(self.pin, gpio.OUT)
-        self.pwm = gpio.PWM(self.pin, self.freq)
+        if self.pwm is None:
+            self.pwm = SoftwarePWM(self.pin, self.freq)
         self.pwm.start(0)
+        self.duty_cycle = 0
+
+    def quantize(self, duty_cycle: float) -> float:
+        return min(max(round(duty_cycle / self.resolution) * self.resolution, 0), 100)
 
     def set_duty_cycle(self, duty_cycle: int) -> None:
-        self.pwm.ChangeDutyCycle(duty_cycle)
+        # The heater loop resends its output every tick; only touch the PWM when it moves
+        duty_cycle = self.quantize(duty_cycle)
+        if duty_cycle == self.duty_cycle:
+            self.skipped += 1
+            return
+        self.pwm.change_duty_cycle(duty_cycle)
+        self.duty_cycle = duty_cycle
+        self.updates += 1
 
     def disable(self) -> None:
         self.pwm.stop()
+        self.duty_cycle = None
 
+    def stats(self) -> Dict[str, Any]:
+        return {"duty_cycle": self.duty_cycle, "updates": self.updates, "skipped": self.skipped}
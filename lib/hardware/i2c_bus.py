@@ -0,0 +1,159 @@
+import time
+from threading import RLock
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from clock.clock import Clock, SystemClock
+from config.logger_manager import LoggerManager
+from data.stats import RunningStats
+
+if TYPE_CHECKING:
+    from smbus2 import i2c_msg
+    from hardware.ads7142 import ADS7142
+
+
+class I2CBus:
+    def __init__(
+        self,
+        logger: LoggerManager,
+        bus_number: int,
+        sweep_period_s: float=0.0,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.logger = logger
+        self.bus_number = bus_number
+        self.sweep_period_s = sweep_period_s
+        self.clock = clock if clock is not None else SystemClock()
+        from smbus2 import SMBus
+        self.smbus = SMBus(bus_number)
+
+        self.mtx = RLock()
+        self.devices: List["ADS7142"] = []
+        self.readings: Dict[int, List[float]] = {}
+        self.last_sweep = -float("inf")
+        self.sweeps = 0
+        self.latency_s: Dict[str, RunningStats] = {
+            "write": RunningStats(),
+            "read": RunningStats(),
+            "sweep": RunningStats(),
+        }
+
+    def register(self, device: "ADS7142") -> None:
+        with self.mtx:
+            if any(d.device_address == device.device_address for d in self.devices):
+                raise ValueError(
+                    f"Device 0x{device.device_address:02x} already registered on bus {self.bus_number}"
+                )
+            self.devices.append(device)
+
+    def unregister(self, device: "ADS7142") -> None:
+        with self.mtx:
+            self.devices.remove(device)
+            self.readings.pop(device.device_address, None)
+
+    def i2c_rdwr(self, *msgs: "i2c_msg") -> None:
+        kind = "read" if any(msg.flags & 0x0001 for msg in msgs) else "write"
+        with self.mtx:
+            start = time.perf_counter()
+            self.smbus.i2c_rdwr(*msgs)
+            self.latency_s[kind].add(time.perf_counter() - start)
+
+    def read_i2c_block_data(self, device_address: int, register: int, length: int) -> List[int]:
+        with self.mtx:
+            start = time.perf_counter()
+            data = self.smbus.read_i2c_block_data(device_address, register, length)
+            self.latency_s["read"].add(time.perf_counter() - start)
+        return data
+
+    def read(self, device: "ADS7142") -> List[float]:
+        # The first reader in a period sweeps every ADC on the bus, the
+        # rest of the period is served from that sweep.
+        with self.mtx:
+            if (
+                device.device_address not in self.readings
+                or self.clock.monotonic() - self.last_sweep >= self.sweep_period_s
+            ):
+                self.sweep()
+            return list(self.readings[device.device_address])
+
+    def sweep(self) -> None:
+        from hardware.ads7142 import ADS7142
+
+        with self.mtx:
+            start = time.perf_counter()
+            # Stamped before the transfers, so sweep_period_s bounds the age of the sample
+            # rather than the time since the last sweep finished
+            swept_at = self.clock.monotonic()
+            for device in self.devices:
+                device.stop_sequence()
+            blocks = [device.read_block() for device in self.devices]
+            for device in self.devices:
+                device.start_sequence()
+
+            thermistors = {device.thermistor for device in self.devices}
+            if len(thermistors) == 1:
+                data_C, counter = ADS7142.decode_thermistor_blocks(blocks, thermistors.pop())
+            else:
+                data_C, counter = zip(*[
+                    ADS7142.decode_thermistor_block(block, device.thermistor)
+                    for device, block in zip(self.devices, blocks)
+                ])
+
+            for device, temps_C, count in zip(self.devices, data_C, counter):
+                for idx in range(2):
+                    if count[idx] == 0:
+                        self.logger.warning(
+                            f"ADS7142 0x{device.device_address:02x} channel {idx+1} has no valid readings"
+                        )
+                self.readings[device.device_address] = [float(t) for t in temps_C]
+
+            self.last_sweep = swept_at
+            self.sweeps += 1
+            self.latency_s["sweep"].add(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.mtx:
+            return {
+                "devices": [f"0x{device.device_address:02x}" for device in self.devices],
+                "sweeps": self.sweeps,
+                "latency_ms": {kind: stats.to_dict(1e3) for kind, stats in self.latency_s.items()},
+            }
+
+    def close(self) -> None:
+        with self.mtx:
+            self.smbus.close()
+
+
+class I2CBusManager:
+    def __init__(
+        self,
+        logger: LoggerManager,
+        sweep_period_s: float=0.0,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.logger = logger
+        self.sweep_period_s = sweep_period_s
+        self.clock = clock
+        self.buses: Dict[int, I2CBus] = {}
+        self.mtx = RLock()
+
+    def get(self, bus_number: int) -> I2CBus:
+        with self.mtx:
+            if bus_number not in self.buses:
+                self.buses[bus_number] = I2CBus(
+                    self.logger,
+                    bus_number,
+                    self.sweep_period_s,
+                    self.clock,
+                )
+            return self.buses[bus_number]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.mtx:
+            buses = list(self.buses.values())
+        return {f"bus_{bus.bus_number}": bus.stats() for bus in buses}
+
+    def close(self) -> None:
+        with self.mtx:
+            for bus in self.buses.values():
+                bus.close()
+            self.buses.clear()
@@ -0,0 +1,114 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from config.config import Config
+
+
+class PWMOutput(ABC):
+    @abstractmethod
+    def start(self, duty_cycle: float) -> None:
+        raise RuntimeError("Can't call base PWM output")
+
+    @abstractmethod
+    def change_duty_cycle(self, duty_cycle: float) -> None:
+        raise RuntimeError("Can't call base PWM output")
+
+    @abstractmethod
+    def stop(self) -> None:
+        raise RuntimeError("Can't call base PWM output")
+
+
+class SoftwarePWM(PWMOutput):
+    # RPi.GPIO times the pulses from its own thread per pin
+    def __init__(self, pin: int, freq: int) -> None:
+        import RPi.GPIO as gpio
+        self.pin = pin
+        self.freq = freq
+        gpio.setup(self.pin, gpio.OUT)
+        self.pwm = gpio.PWM(self.pin, self.freq)
+
+    def start(self, duty_cycle: float) -> None:
+        self.pwm.start(duty_cycle)
+
+    def change_duty_cycle(self, duty_cycle: float) -> None:
+        self.pwm.ChangeDutyCycle(duty_cycle)
+
+    def stop(self) -> None:
+        self.pwm.stop()
+
+
+class PigpioPWM(PWMOutput):
+    # pigpiod times the pulses with DMA, so control thread load does not add jitter
+    RANGE = 1000
+
+    def __init__(self, pi: Any, pin: int, freq: int) -> None:
+        self.pi = pi
+        self.pin = pin
+        self.freq = freq
+        self.pi.set_PWM_frequency(self.pin, self.freq)
+        self.pi.set_PWM_range(self.pin, self.RANGE)
+
+    def start(self, duty_cycle: float) -> None:
+        self.change_duty_cycle(duty_cycle)
+
+    def change_duty_cycle(self, duty_cycle: float) -> None:
+        self.pi.set_PWM_dutycycle(self.pin, int(round(duty_cycle * self.RANGE / 100)))
+
+    def stop(self) -> None:
+        self.pi.set_PWM_dutycycle(self.pin, 0)
+
+
+class SysfsPWM(PWMOutput):
+    # Kernel PWM driver through /sys/class/pwm; any directory with the same layout works
+    def __init__(
+        self,
+        root: str,
+        chip: int,
+        channel: int,
+        freq: int,
+    ) -> None:
+        self.chip_path = os.path.join(root, f"pwmchip{chip}")
+        self.path = os.path.join(self.chip_path, f"pwm{channel}")
+        self.period_ns = int(round(1e9 / freq))
+        if not os.path.isdir(self.path):
+            self.write(os.path.join(self.chip_path, "export"), channel)
+            os.makedirs(self.path, exist_ok=True)
+        self.write(os.path.join(self.path, "period"), self.period_ns)
+
+    @staticmethod
+    def write(path: str, value: Any) -> None:
+        with open(path, "w") as f:
+            f.write(f"{value}\n")
+
+    def start(self, duty_cycle: float) -> None:
+        self.change_duty_cycle(duty_cycle)
+        self.write(os.path.join(self.path, "enable"), 1)
+
+    def change_duty_cycle(self, duty_cycle: float) -> None:
+        self.write(os.path.join(self.path, "duty_cycle"), int(round(self.period_ns * duty_cycle / 100)))
+
+    def stop(self) -> None:
+        self.change_duty_cycle(0)
+        self.write(os.path.join(self.path, "enable"), 0)
+
+
+def CreatePWM(
+    config: Config,
+    ssr: Config,
+    channel: int,
+    pi: Optional[Any]=None,
+) -> PWMOutput:
+    driver = config.get("driver", "software")
+    if driver == "software":
+        return SoftwarePWM(ssr.pin, ssr.freq)
+    if driver == "pigpio":
+        return PigpioPWM(pi, ssr.pin, ssr.freq)
+    if driver == "sysfs":
+        return SysfsPWM(
+            config.get("sysfs_root", "/sys/class/pwm"),
+            ssr.get("pwm_chip", 0),
+            ssr.get("pwm_channel", channel - 1),
+            ssr.freq,
+        )
+    raise ValueError(f"Unknown PWM driver {driver}")
@@ -1,57 +1,158 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from threading import Lock
+from typing import Any, Dict, Optional
 from config.logger_manager import LoggerManager
 from Phidget22.Phidget import PhidgetException
 from Phidget22.Devices.DigitalOutput import DigitalOutput
 
 
 class REL1101:
-    _instance = None
-    _lock: Lock = Lock()
-
-    def __new__(
-        cls,
-        logger: LoggerManager,
-        hub_port: int,
-        timeout: int,
-    ):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(REL1101, cls).__new__(cls)
-                cls._instance.initialize(logger, hub_port, timeout)
-            return cls._instance
-
-    def initialize(
+    def __init__(
         self,
         logger: LoggerManager,
         hub_port: int,
         timeout: int,
+        executor: Optional[Executor]=None,
     ) -> None:
         self.logger = logger
         self.hub_port = hub_port
         self.timeout = timeout
-        self.channels = {}
+        self.executor = executor
+        self.channels: Dict[int, DigitalOutput] = {}
+        self.attaching: Dict[int, Future] = {}
+        # One lock per relay channel, so a slow Phidget call only holds up its own fan
+        self.locks: Dict[int, Lock] = {}
+        self.states: Dict[int, Optional[bool]] = {}
+        self.registry_lock = Lock()
+        self.coalesced = 0
 
-    def register_channel(self, channel: int) -> None:
+    def attach(self, channel: int) -> DigitalOutput:
         ch = DigitalOutput()
         ch.setHubPort(self.hub_port)
         ch.setChannel(channel)
         ch.openWaitForAttachment(self.timeout)
-        self.channels[channel] = ch
-        self.channels[channel].setDutyCycle(0)
+        ch.setDutyCycle(0)
+        return ch
+
+    def register_channel(self, channel: int) -> None:
+        with self.registry_lock:
+            if channel in self.locks:
+                return
+            self.locks[channel] = Lock()
+            self.states[channel] = None
+            if self.executor is None:
+                self.channels[channel] = self.attach(channel)
+                self.states[channel] = False
+                return
+            # Attach in the background; the first command on the relay waits for it
+            self.attaching[channel] = self.executor.submit(self.attach, channel)
+
+    def wait_attached(self, channel: int) -> None:
+        if channel in self.channels:
+            return
+        future = self.attaching.get(channel)
+        if future is None:
+            raise KeyError(f"Relay channel {channel} is not registered on hub port {self.hub_port}")
+        ch = future.result()
+        with self.registry_lock:
+            if channel not in self.channels:
+                self.channels[channel] = ch
+                self.states[channel] = False
+                self.attaching.pop(channel, None)
+
+    def set_state(self, fan_channel: int, on: bool) -> bool:
+        with self.locks[fan_channel]:
+            self.wait_attached(fan_channel)
+            if self.states[fan_channel] == on:
+                self.coalesced += 1
+                return False
+            # Unknown until the call succeeds, so a failed command is retried next time
+            self.states[fan_channel] = None
+            self.channels[fan_channel].setDutyCycle(1 if on else 0)
+            self.states[fan_channel] = on
+            return True
 
     def turn_on(self, fan_channel: int) -> None:
         try:
-            with self._lock:
-                self.channels[fan_channel].setDutyCycle(1)
-                self.logger.info(f"Turned on relay channel {fan_channel}")
+            changed = self.set_state(fan_channel, True)
         except PhidgetException as e:
             self.logger.error(f"Error turning on relay channel {fan_channel}: {e.details}")
+            return
+        if changed:
+            self.logger.info(f"Turned on relay channel {fan_channel}")
 
     def turn_off(self, fan_channel: int) -> None:
         try:
-            with self._lock:
-                self.channels[fan_channel].setDutyCycle(0)
-                self.logger.info(f"Turned off relay channel {fan_channel}")
+            changed = self.set_state(fan_channel, False)
         except PhidgetException as e:
             self.logger.error(f"Error turning off relay channel {fan_channel}: {e.details}")
+            return
+        if changed:
+            self.logger.info(f"Turned off relay channel {fan_channel}")
+
+    def get_state(self, fan_channel: int) -> Optional[bool]:
+        return self.states.get(fan_channel)
+
+    def close(self) -> None:
+        with self.registry_lock:
+            channels = list(self.channels.values())
+            self.channels.clear()
+        for ch in channels:
+            ch.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "attached": sorted(self.channels),
+            "attaching": sorted(self.attaching),
+            "states": dict(self.states),
+            "coalesced": self.coalesced,
+        }
+
+
+class RelayManager:
+    def __init__(
+        self,
+        logger: LoggerManager,
+        max_workers: int=8,
+    ) -> None:
+        self.logger = logger
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="relay_attach")
+        self.hubs: Dict[int, REL1101] = {}
+        self.mtx = Lock()
+
+    def hub(self, hub_port: int, timeout: int) -> REL1101:
+        with self.mtx:
+            if hub_port not in self.hubs:
+                self.hubs[hub_port] = REL1101(self.logger, hub_port, timeout, self.executor)
+            elif self.hubs[hub_port].timeout != timeout:
+                self.logger.warning(
+                    f"Hub port {hub_port} already opened with timeout {self.hubs[hub_port].timeout}, ignoring {timeout}"
+                )
+            return self.hubs[hub_port]
+
+    def wait_attached(self) -> None:
+        with self.mtx:
+            hubs = list(self.hubs.values())
+        failures = []
+        for hub in hubs:
+            for channel in list(hub.attaching):
+                try:
+                    hub.wait_attached(channel)
+                except PhidgetException as e:
+                    self.logger.error(f"Error attaching relay {hub.hub_port}/{channel}: {e.details}")
+                    failures.append(f"{hub.hub_port}/{channel}")
+        if failures:
+            raise RuntimeError(f"Relays failed to attach: {', '.join(failures)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self.mtx:
+            hubs = list(self.hubs.values())
+        return {f"hub_{hub.hub_port}": hub.stats() for hub in hubs}
 
+    def close(self) -> None:
+        with self.mtx:
+            hubs = list(self.hubs.values())
+            self.hubs.clear()
+        for hub in hubs:
+            hub.close()
+        self.executor.shutdown(wait=True)
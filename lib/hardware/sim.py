@@ -0,0 +1,208 @@
+import math
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional
+import numpy as np
+
+from clock.clock import Clock, SystemClock
+from config.config import Config
+from config.logger_manager import LoggerManager
+from hardware.ads7142 import ADC_CODES, ADS7142, DEFAULT_THERMISTOR, code_array
+from hardware.backend import HardwareBackend
+
+
+class ThermalPlant:
+    def __init__(
+        self,
+        ambient_C: float,
+        heater_gain_C_per_s: float,
+        loss_per_s: float,
+        fan_loss_per_s: float,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.ambient_C = ambient_C
+        self.heater_gain_C_per_s = heater_gain_C_per_s
+        self.loss_per_s = loss_per_s
+        self.fan_loss_per_s = fan_loss_per_s
+        self.clock = clock if clock is not None else SystemClock()
+
+        self.temperature_C = ambient_C
+        self.duty_cycle = 0.0
+        self.fan_on = False
+        self.last_update = self.clock.monotonic()
+        self.mtx = Lock()
+
+    def advance(self) -> float:
+        with self.mtx:
+            now = self.clock.monotonic()
+            dt = now - self.last_update
+            self.last_update = now
+
+            # Exact step of dT/dt = gain*dc - k*(T - ambient), so large
+            # steps under accelerated clocks stay stable
+            k = self.loss_per_s + (self.fan_loss_per_s if self.fan_on else 0.0)
+            equilibrium_C = self.ambient_C + self.heater_gain_C_per_s * self.duty_cycle / 100 / k
+            self.temperature_C = equilibrium_C + (self.temperature_C - equilibrium_C) * math.exp(-k * dt)
+            return self.temperature_C
+
+    def set_duty_cycle(self, duty_cycle: float) -> None:
+        self.advance()
+        with self.mtx:
+            self.duty_cycle = duty_cycle
+
+    def set_fan(self, on: bool) -> None:
+        self.advance()
+        with self.mtx:
+            self.fan_on = on
+
+
+class SimADS7142:
+    def __init__(
+        self,
+        logger: LoggerManager,
+        plant: ThermalPlant,
+        thermistor: str=DEFAULT_THERMISTOR,
+        offsets_C: Iterable[float]=(0.0, 0.0),
+        noise_C: float=0.0,
+        seed: int=0,
+    ) -> None:
+        self.logger = logger
+        self.plant = plant
+        self.thermistor = thermistor
+        self.offsets_C = np.asarray(list(offsets_C), dtype=np.float64)
+        self.noise_C = noise_C
+        self.rng = np.random.default_rng(seed)
+        # Samples alternate between the left and right thermistor
+        self.channel_bits = np.tile(np.array([0b0000, 0b0010]), 8)
+
+    def temperature_to_code(self, temperature_C: np.ndarray) -> np.ndarray:
+        codes = np.searchsorted(code_array(self.thermistor), temperature_C * 10)
+        return np.clip(codes, 0, ADC_CODES - 1)
+
+    def read_block(self) -> bytes:
+        temperature_C = self.plant.advance() + self.offsets_C[self.channel_bits >> 1]
+        if self.noise_C:
+            temperature_C = temperature_C + self.rng.normal(0.0, self.noise_C, len(temperature_C))
+        codes = self.temperature_to_code(temperature_C)
+        return ((codes << 4) | self.channel_bits | 0x0001).astype(">u2").tobytes()
+
+    def read_thermistor_values(self) -> Iterable[float]:
+        data_C, _ = ADS7142.decode_thermistor_block(self.read_block(), self.thermistor)
+        return data_C
+
+
+class SimCPC1706Y:
+    def __init__(
+        self,
+        logger: LoggerManager,
+        plant: ThermalPlant,
+    ) -> None:
+        self.logger = logger
+        self.plant = plant
+
+    def set_duty_cycle(self, duty_cycle: int) -> None:
+        self.plant.set_duty_cycle(duty_cycle)
+
+    def disable(self) -> None:
+        self.plant.set_duty_cycle(0)
+
+
+class SimREL1101:
+    def __init__(
+        self,
+        logger: LoggerManager,
+    ) -> None:
+        self.logger = logger
+        self.plants: Dict[int, ThermalPlant] = {}
+        self.channels: Dict[int, bool] = {}
+        self.registry_lock = Lock()
+
+    def attach(self, channel: int, plant: ThermalPlant) -> None:
+        with self.registry_lock:
+            self.plants[channel] = plant
+
+    def register_channel(self, channel: int) -> None:
+        with self.registry_lock:
+            self.channels[channel] = False
+            plant = self.plants[channel]
+        plant.set_fan(False)
+
+    def turn_on(self, fan_channel: int) -> None:
+        if self.channels[fan_channel]:
+            return
+        self.channels[fan_channel] = True
+        self.plants[fan_channel].set_fan(True)
+        self.logger.info(f"Turned on relay channel {fan_channel}")
+
+    def turn_off(self, fan_channel: int) -> None:
+        if not self.channels[fan_channel]:
+            return
+        self.channels[fan_channel] = False
+        self.plants[fan_channel].set_fan(False)
+        self.logger.info(f"Turned off relay channel {fan_channel}")
+
+
+class SimBackend(HardwareBackend):
+    def __init__(
+        self,
+        logger: LoggerManager,
+        config: Config,
+        clock: Optional[Clock]=None,
+    ) -> None:
+        self.logger = logger
+        self.config = config
+        self.clock = clock
+        self.plants: Dict[int, ThermalPlant] = {}
+        self.plants_mtx = Lock()
+        # One simulated relay board per hub port, like RelayManager
+        self.relays: Dict[int, SimREL1101] = {}
+
+    def plant(self, channel: int) -> ThermalPlant:
+        with self.plants_mtx:
+            return self.get_plant(channel)
+
+    def get_plant(self, channel: int) -> ThermalPlant:
+        if channel not in self.plants:
+            self.plants[channel] = ThermalPlant(
+                ambient_C=self.config.get("ambient_C", 22.0),
+                heater_gain_C_per_s=self.config.get("heater_gain_C_per_s", 2.0),
+                loss_per_s=self.config.get("loss_per_s", 0.01),
+                fan_loss_per_s=self.config.get("fan_loss_per_s", 0.05),
+                clock=self.clock,
+            )
+        return self.plants[channel]
+
+    def configure(self) -> None:
+        self.logger.info("Using simulated hardware backend")
+
+    def cleanup(self) -> None:
+        pass
+
+    def create_therms(self, config: Config, channel: int) -> SimADS7142:
+        return SimADS7142(
+            logger=self.logger,
+            plant=self.plant(channel),
+            thermistor=config.i2c.get("thermistor", DEFAULT_THERMISTOR),
+            offsets_C=self.config.get("offsets_C", [0.0, 0.5]),
+            noise_C=self.config.get("noise_C", 0.2),
+            seed=self.config.get("seed", 0) + channel,
+        )
+
+    def create_ssr(self, config: Config, channel: int) -> SimCPC1706Y:
+        return SimCPC1706Y(logger=self.logger, plant=self.plant(channel))
+
+    def create_fan_controller(self, config: Config, channel: int) -> SimREL1101:
+        with self.plants_mtx:
+            relay = self.relays.get(config.fan.port)
+            if relay is None:
+                relay = self.relays[config.fan.port] = SimREL1101(self.logger)
+        relay.attach(config.fan.channel, self.plant(channel))
+        return relay
+
+    def wait_ready(self) -> None:
+        pass
+
+    def bus_stats(self) -> Dict[str, Any]:
+        return {}
+
+    def relay_stats(self) -> Dict[str, Any]:
+        return {}
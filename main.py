@@ -1,18 +1,36 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from config.config import Config
 from config.logger_manager import LoggerManager
 from app.app import Application
-from app_ipc.server import Server
+from app.async_runtime import AsyncScheduler
+from app_ipc.server import CreateServer
+from app_ipc.telemetry import CreateTelemetryPublisher
 
 
 def main():
-    config = Config.from_file(os.path.abspath("config/config.yaml"))
+    config_path = os.path.abspath("config/config.yaml")
+    config = Config.from_file(config_path)
     config.merge(config)
     logger = LoggerManager.get_logger(config.log)
 
-    app = Application(config.app, logger)
-    server = Server(app)
+    telemetry = CreateTelemetryPublisher(config.get("ipc", Config()))
+    app = Application(config.app, logger, config_path, telemetry)
+
+    if isinstance(app.scheduler, AsyncScheduler):
+        # IPC handlers get their own pool so a slow request can't hold up control ticks
+        ipc_executor = ThreadPoolExecutor(
+            max_workers=config.get("ipc", Config()).get("read_workers", 4),
+            thread_name_prefix="ipc",
+        )
+        server = CreateServer(config.get("ipc", Config()), app, ipc_executor)
+        app.launch()
+        app.scheduler.run_until_complete(server.serve())
+        ipc_executor.shutdown(wait=True)
+        return
+
+    server = CreateServer(config.get("ipc", Config()), app)
 
     app.launch()
     server.run()
@@ -0,0 +1,101 @@
+import random
+from typing import List, Sequence
+
+import pytest
+
+from hardware.ads7142 import (
+    ADC_CODES,
+    ADS7142,
+    DEFAULT_THERMISTOR,
+    INVALID_READING,
+    THERMISTOR_TABLES,
+    NTC_table,
+    code_array,
+    code_table,
+    register_thermistor,
+)
+
+
+def legacy_temp(table: Sequence[int], val: int) -> float:
+    p1 = table[(val >> 5)]
+    p2 = table[(val >> 5) + 1]
+    return p1 + ((p2 - p1) * (val & 0x001F)) / 32
+
+
+def legacy_decode(table: Sequence[int], read_data: Sequence[int]) -> List[float]:
+    data = ADS7142.bytes_to_int16(read_data)
+    counter = [0, 0]
+    accumulate_mC = [0, 0]
+    for val in data:
+        if val & 0x0001:
+            idx = 1 if val & 0b1110 else 0
+            counter[idx] += 1
+            accumulate_mC[idx] += legacy_temp(table, (val & 0xFFF0) >> 4)
+    return [
+        accumulate_mC[idx] / counter[idx] / 10 if counter[idx] != 0 else INVALID_READING / 10
+        for idx in range(2)
+    ]
+
+
+def random_block(rng: random.Random) -> List[int]:
+    block = []
+    for _ in range(16):
+        val = (rng.randrange(ADC_CODES) << 4) | (rng.choice((0b0000, 0b0010)) if rng.random() < 0.9 else 0) | (rng.random() < 0.9)
+        block += [val >> 8, val & 0xFF]
+    return block
+
+
+@pytest.fixture
+def steep_table():
+    name = "test_steep"
+    register_thermistor(name, [3 * value + 7 for value in NTC_table])
+    yield name
+    del THERMISTOR_TABLES[name]
+    code_table.cache_clear()
+    code_array.cache_clear()
+
+
+def test_code_table_matches_calculate_temp():
+    lut = code_table()
+    assert len(lut) == ADC_CODES
+    for code in range(ADC_CODES):
+        assert lut[code] == ADS7142.calculate_temp(code), code
+
+
+def test_code_table_matches_registered_tables(steep_table):
+    for name in (DEFAULT_THERMISTOR, steep_table):
+        table = THERMISTOR_TABLES[name]
+        lut = code_table(name)
+        for code in range(ADC_CODES):
+            assert lut[code] == legacy_temp(table, code), (name, code)
+
+
+def test_register_thermistor_rejects_wrong_length():
+    with pytest.raises(ValueError):
+        register_thermistor("test_short", NTC_table[:-1])
+
+
+def test_decode_matches_legacy(steep_table):
+    rng = random.Random(0)
+    blocks = [random_block(rng) for _ in range(500)] + [[0] * 32]
+    for name in (DEFAULT_THERMISTOR, steep_table):
+        table = THERMISTOR_TABLES[name]
+        batched, counters = ADS7142.decode_thermistor_blocks(blocks, name)
+        for block, row, counter in zip(blocks, batched.tolist(), counters.tolist()):
+            expected = legacy_decode(table, block)
+            actual, actual_counter = ADS7142.decode_thermistor_block(block, name)
+            assert actual == expected
+            assert row == expected
+            assert counter == actual_counter
+
+
+def test_decode_every_code():
+    # Each block holds one code on both channels, so every entry is exercised
+    for code in range(ADC_CODES):
+        block = []
+        for idx in range(16):
+            val = (code << 4) | (0b0010 if idx % 2 else 0) | 1
+            block += [val >> 8, val & 0xFF]
+        expected = legacy_decode(NTC_table, block)
+        assert ADS7142.decode_thermistor_block(block)[0] == expected
+        assert ADS7142.decode_thermistor_blocks([block])[0].tolist()[0] == expected
@@ -0,0 +1,108 @@
+import logging
+import os
+
+import pytest
+
+from app.channel import CreateChannel, HeatingState
+from app.scheduler import DeadlineScheduler
+from clock.clock import VirtualClock
+from config.config import Config
+from data.checkpoint import Checkpoint, CheckpointStore
+from hardware.sim import SimBackend
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "config.yaml")
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config.from_file(CONFIG_PATH)
+    channel = config.app.channel_1
+    channel.csv.base_path = os.path.join(str(tmp_path), "csv", "")
+    channel.csv.cycle_path = os.path.join(str(tmp_path), "csv", "cycles", "")
+    channel.csv.history = False
+    os.makedirs(channel.csv.cycle_path)
+    return channel
+
+
+@pytest.fixture
+def make_channel(config):
+    logger = logging.getLogger("test")
+    clock = VirtualClock()
+    created = []
+
+    def make(checkpoints=None):
+        # An unstarted scheduler only queues the ticks, so nothing runs behind the test
+        backend = SimBackend(logger, Config(), clock)
+        channel = CreateChannel(
+            config,
+            logger,
+            1,
+            backend,
+            scheduler=DeadlineScheduler(logger, clock=clock),
+            checkpoints=checkpoints,
+            clock=clock,
+        )
+        created.append(channel)
+        return channel
+
+    yield make
+    for channel in created:
+        channel.cycle_frame.close()
+        channel.channel_frame.close()
+
+
+def test_resumed_cycle_rows_feed_cycle_stats(config, make_channel):
+    path = os.path.join(config.csv.cycle_path, "cycle_0.csv")
+    with open(path, "w") as f:
+        f.write(",timestamp,therm_L_C,therm_R_C,duty_cycle,cycle\n")
+        f.write("0,2026-01-01 00:00:00,30.0,31.0,100.0,0\n")
+        f.write("1,2026-01-01 00:00:01,35.0,36.0,90.0,0\n")
+
+    channel = make_channel()
+    assert len(channel.cycle_frame) == 2
+    stats = channel.cycle_stats
+    assert stats.temps_C.count == 4
+    assert stats.temps_C.max == 36.0
+    assert stats.temps_C.min == 30.0
+    assert stats.ss_temp_C.mean == pytest.approx(33.5)
+    assert stats.ss_pwm.mean == pytest.approx(95.0)
+
+
+def test_sim_relays_are_per_hub_port():
+    logger = logging.getLogger("test")
+    backend = SimBackend(logger, Config(), VirtualClock())
+    first = Config()
+    first.update({"fan": {"port": 0, "channel": 8}})
+    second = Config()
+    second.update({"fan": {"port": 1, "channel": 8}})
+
+    relay_1 = backend.create_fan_controller(first, 1)
+    relay_2 = backend.create_fan_controller(second, 2)
+    assert relay_1 is not relay_2
+    assert backend.create_fan_controller(first, 1) is relay_1
+
+    relay_1.register_channel(8)
+    relay_2.register_channel(8)
+    relay_1.turn_on(8)
+    assert backend.plant(1).fan_on
+    assert not backend.plant(2).fan_on
+
+
+def test_resumes_cooling_from_checkpoint(tmp_path, config, make_channel):
+    checkpoints = CheckpointStore(str(tmp_path / "checkpoints"), sync=False)
+    checkpoints.save(1, Checkpoint(cycle_no=42, heating_state=HeatingState.COOLING.value, timestamp=0.0))
+
+    channel = make_channel(checkpoints)
+    assert channel.cycle_no == 42
+    assert channel.heating_state == HeatingState.COOLING
+    assert channel.fan_controller.channels[config.fan.channel]
+    assert channel.heater_controller.get_setpoint() == config.controller.low_setpoint
+
+
+def test_starts_heating_without_checkpoint(tmp_path, config, make_channel):
+    channel = make_channel(CheckpointStore(str(tmp_path / "checkpoints"), sync=False))
+    assert channel.cycle_no == config.cycle_no
+    assert channel.heating_state == HeatingState.HEATING
+    assert not channel.fan_controller.channels[config.fan.channel]
+    assert channel.heater_controller.get_setpoint() == config.controller.high_setpoint
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from data.checkpoint import CHECKPOINT, CHECKPOINT_CRC, Checkpoint, CheckpointStore
+
+
+def test_round_trip(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    checkpoint = Checkpoint(cycle_no=1234, heating_state=0, timestamp=1.7e9 + 0.25)
+    store.save(3, checkpoint)
+    assert store.load(3) == checkpoint
+    assert os.path.getsize(store.path(3)) == CHECKPOINT.size + CHECKPOINT_CRC.size
+
+
+def test_missing_checkpoint_loads_none(tmp_path):
+    assert CheckpointStore(str(tmp_path)).load(1) is None
+
+
+def test_encode_decode():
+    checkpoint = Checkpoint(7, 1, 123.5)
+    assert CheckpointStore.decode(2, CheckpointStore.encode(2, checkpoint)) == checkpoint
+
+
+def test_rejects_bad_crc():
+    data = bytearray(CheckpointStore.encode(1, Checkpoint(7, 1, 123.5)))
+    data[10] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        CheckpointStore.decode(1, bytes(data))
+
+
+def test_rejects_wrong_channel():
+    data = CheckpointStore.encode(1, Checkpoint(7, 1, 123.5))
+    with pytest.raises(ValueError, match="channel 1"):
+        CheckpointStore.decode(2, data)
+
+
+@pytest.mark.parametrize("size", [0, CHECKPOINT.size, CHECKPOINT.size + CHECKPOINT_CRC.size + 1])
+def test_rejects_wrong_length(size):
+    data = CheckpointStore.encode(1, Checkpoint(7, 1, 123.5)).ljust(size, b"\0")[:size]
+    with pytest.raises(ValueError, match="bytes"):
+        CheckpointStore.decode(1, data)
+
+
+def test_save_replaces_atomically(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path), sync=False)
+    store.save(1, Checkpoint(1, 1, 1.0))
+
+    def fail_replace(src, dst):
+        raise OSError("crash before rename")
+
+    # A crash before the rename leaves the previous checkpoint intact
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        store.save(1, Checkpoint(2, 0, 2.0))
+    monkeypatch.undo()
+    assert store.load(1) == Checkpoint(1, 1, 1.0)
+
+    store.save(1, Checkpoint(3, 0, 3.0))
+    assert store.load(1) == Checkpoint(3, 0, 3.0)
@@ -0,0 +1,54 @@
+import datetime
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from data.dataframes import Frame
+
+
+CYCLE_HEADERS = ["max_temp_C", "min_temp_C", "ss_temp_C", "ss_pwm", "cycle"]
+Summary = namedtuple("Summary", CYCLE_HEADERS)
+Sample = namedtuple("Sample", ["timestamp", "temp", "cycle"])
+
+
+def test_append_resumes_after_existing_rows(tmp_path):
+    path = str(tmp_path) + os.sep
+    frame = Frame("c", list(Sample._fields), path, stream=True, flush_rows=1)
+    frame.set_filename("cycle_3")
+    for idx in range(3):
+        frame.add_row(Sample(datetime.datetime(2026, 1, 1, 0, 0, idx), float(idx), 3))
+    frame.writer.flush()
+
+    resumed = Frame("c", list(Sample._fields), path, stream=True, flush_rows=1)
+    resumed.set_filename("cycle_3")
+    resumed.load()
+    for idx in range(3, 5):
+        resumed.add_row(Sample(datetime.datetime(2026, 1, 1, 0, 0, idx), float(idx), 3))
+    resumed.close()
+
+    df = pd.read_csv(resumed.full_path, index_col=0)
+    assert df.index.tolist() == [0, 1, 2, 3, 4]
+    assert df["temp"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_append_normalizes_legacy_layout(tmp_path):
+    # Older releases re-saved cycles.csv with the loaded index as an extra column
+    legacy = tmp_path / "cycles.csv"
+    legacy.write_text(
+        ",Unnamed: 0,max_temp_C,min_temp_C,ss_temp_C,ss_pwm,cycle\n"
+        "0,0,80.0,28.0,79.1,41.0,0\n"
+        "1,1,80.5,28.5,79.0,41.5,1\n"
+    )
+    frame = Frame("c", CYCLE_HEADERS, str(tmp_path) + os.sep, stream=True)
+    frame.set_filename("cycles")
+    frame.load()
+    frame.add_row(Summary(81.0, 29.0, 79.2, 42.0, 2))
+    frame.save()
+    frame.close()
+
+    df = pd.read_csv(legacy, index_col=0)
+    assert list(df.columns) == CYCLE_HEADERS
+    assert df["cycle"].tolist() == [0, 1, 2]
+    assert df["max_temp_C"].tolist() == [80.0, 80.5, 81.0]
+    assert (tmp_path / "cycles.csv.orig").exists()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import random
+import threading
+
+from app.heater_controller import HeaterController
+from app.scheduler import DeadlineScheduler
+from clock.clock import VirtualClock
+
+
+PERIOD_S = 0.2
+
+
+class ManualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def time(self) -> float:
+        return 1e9 + self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class JitteredClock:
+    # What a controller sees when its ticks land a little off the scheduler's deadlines
+    def __init__(self, clock: VirtualClock, jitter_s: float) -> None:
+        self.clock = clock
+        self.rng = random.Random(0)
+        self.jitter_s = jitter_s
+
+    def time(self) -> float:
+        return self.clock.time()
+
+    def monotonic(self) -> float:
+        return self.clock.monotonic() + self.rng.uniform(0, self.jitter_s)
+
+
+class CountingPID:
+    output_limits = (0, 100)
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, value: float, setpoint: float) -> float:
+        self.calls += 1
+        return 50.0
+
+
+class FakeTherms:
+    def read_thermistor_values(self):
+        return [40.0, 41.0]
+
+
+class FakeSSR:
+    def set_duty_cycle(self, duty_cycle: float) -> None:
+        self.duty_cycle = duty_cycle
+
+
+def heater(clock) -> HeaterController:
+    controller = HeaterController(
+        logger=logging.getLogger("test"),
+        pid=CountingPID(),
+        ssr=FakeSSR(),
+        therms=FakeTherms(),
+        update_interval_s=PERIOD_S,
+        minimum_plausible_reading_C=-10,
+        maximum_overshoot_C=20,
+        shutoff_temperature_C=200,
+        clock=clock,
+    )
+    controller.set_setpoint(80.0)
+    return controller
+
+
+def test_early_ticks_still_update():
+    clock = ManualClock()
+    controller = heater(clock)
+    rng = random.Random(1)
+    for _ in range(200):
+        clock.now += PERIOD_S + rng.uniform(-0.03, 0.03)
+        controller.step()
+    assert controller.pid.calls == 200
+    assert controller.skipped_updates == 0
+
+
+def test_duplicate_tick_is_skipped():
+    clock = ManualClock()
+    controller = heater(clock)
+    clock.now += PERIOD_S
+    controller.step()
+    clock.now += 0.01
+    controller.step()
+    assert controller.pid.calls == 1
+    assert controller.skipped_updates == 1
+
+
+def test_scheduler_gives_one_update_per_tick():
+    clock = VirtualClock()
+    controller = heater(JitteredClock(clock, 0.03))
+    scheduler = DeadlineScheduler(logging.getLogger("test"), clock=clock)
+    steps = []
+    done = threading.Event()
+
+    def tick() -> None:
+        controller.step()
+        steps.append(clock.monotonic())
+        if len(steps) == 100:
+            scheduler.cancel("pid")
+            done.set()
+
+    scheduler.add("pid", tick, PERIOD_S)
+    scheduler.start()
+    assert done.wait(30)
+    scheduler.stop()
+    scheduler.join()
+    # The first tick falls due as the controller is built, before a full period has passed
+    assert len(steps) == 100
+    assert controller.pid.calls == 99
+    assert controller.skipped_updates == 1
+
+
+def test_step_async_sends_only_driver_calls_to_executor():
+    clock = ManualClock()
+    controller = heater(clock)
+    io_calls = []
+
+    async def run_io(callback, *args):
+        io_calls.append(callback.__name__)
+        return callback(*args)
+
+    clock.now += PERIOD_S
+    asyncio.run(controller.step_async(run_io))
+    assert io_calls == ["read_thermistor_values", "set_duty_cycle"]
+    assert controller.pid.calls == 1
+    assert controller.get_dc() == 50.0
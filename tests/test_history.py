@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.history import CycleIndex, HistoryStore, bucket_bounds
+
+
+HEADERS = ["timestamp", "therm_L_C", "therm_R_C", "duty_cycle", "cycle"]
+
+
+def cycle_columns(cycle, rows=4, right=True):
+    timestamps = np.datetime64("2026-01-01T10:00:00", "us") + np.arange(rows) * np.timedelta64(500, "ms")
+    timestamps += np.timedelta64(cycle, "m")
+    values = np.arange(rows, dtype=np.float64) + 10.0 * cycle
+    return {
+        "timestamp": timestamps,
+        "therm_L_C": values,
+        "therm_R_C": values + 1.0 if right else np.full(rows, np.nan),
+        "duty_cycle": np.full(rows, 50.0),
+        "cycle": np.full(rows, cycle),
+    }
+
+
+def write_cycle(path, cycle, columns):
+    # Same layout Frame.save produces: index column first, timestamps as text
+    file = path / f"cycle_{cycle}.csv"
+    pd.DataFrame(columns).to_csv(file)
+    return str(file)
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(str(tmp_path), HEADERS)
+    for cycle in range(3):
+        columns = cycle_columns(cycle, right=cycle != 1)
+        history.record(cycle, write_cycle(tmp_path, cycle, columns), columns)
+    return history
+
+
+def test_bucket_bounds():
+    assert bucket_bounds(10, 3).tolist() == [0, 3, 6]
+    assert bucket_bounds(10, 10).tolist() == list(range(10))
+    # Never more buckets than rows, and never an empty bucket
+    assert bucket_bounds(3, 10).tolist() == [0, 1, 2]
+    assert bucket_bounds(1, 4).tolist() == [0]
+
+
+def test_rebuilt_index_matches_recorded(store, tmp_path):
+    recorded = store.index.entries
+    (tmp_path / "index.jsonl").unlink()
+    rebuilt = CycleIndex(str(tmp_path))
+    rebuilt.load()
+    assert rebuilt.entries == recorded
+
+    # A rebuild rewrites the index, and loading it back gives the same entries
+    loaded = CycleIndex(str(tmp_path))
+    loaded.load()
+    assert loaded.entries == recorded
+
+
+def test_load_normalizes_legacy_timestamps(store, tmp_path):
+    index = tmp_path / "index.jsonl"
+    entries = [json.loads(line) for line in index.read_text().splitlines()]
+    for entry in entries:
+        entry["t_start"] = entry["t_start"].replace("T", " ")
+        entry["t_end"] = entry["t_end"].replace("T", " ")
+    index.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+    loaded = CycleIndex(str(tmp_path))
+    loaded.load()
+    assert loaded.entries == store.index.entries
+    assert len(loaded.select(start_time=pd.Timestamp("2026-01-01 10:01:01"))) == 2
+
+
+def test_query_samples(store):
+    result = store.query(start_cycle=1, end_cycle=1, columns=["therm_L_C", "therm_R_C"])
+    assert result["source"] == "samples"
+    assert result["timestamp"][0] == "2026-01-01T10:01:00.000000"
+    assert result["timestamp"][1] == "2026-01-01T10:01:00.500000"
+    assert result["cycle"] == [1, 1, 1, 1]
+    assert result["therm_L_C"] == [10.0, 11.0, 12.0, 13.0]
+    assert result["therm_R_C"] == [None, None, None, None]
+    json.dumps(result, allow_nan=False)
+
+
+def test_bucket_cycles(store):
+    result = store.query(columns=["therm_L_C", "therm_R_C"], buckets=2)
+    assert result["source"] == "cycles"
+    assert result["cycle_start"] == [0, 1]
+    assert result["cycle_end"] == [0, 2]
+    assert result["t_start"] == ["2026-01-01T10:00:00.000000", "2026-01-01T10:01:00.000000"]
+    assert result["t_end"] == ["2026-01-01T10:00:01.500000", "2026-01-01T10:02:01.500000"]
+    assert result["therm_L_C"] == {"min": [0.0, 10.0], "max": [3.0, 23.0], "mean": [1.5, 16.5]}
+    assert result["therm_R_C"] == {"min": [1.0, 21.0], "max": [4.0, 24.0], "mean": [2.5, 22.5]}
+
+    # A bucket with no values at all comes back as None rather than inf/NaN
+    empty = store.query(start_cycle=1, end_cycle=1, columns=["therm_R_C"], buckets=1)
+    assert empty["source"] == "cycles"
+    assert empty["therm_R_C"] == {"min": [None], "max": [None], "mean": [None]}
+    json.dumps(empty, allow_nan=False)
+
+
+def test_bucket_samples(store):
+    result = store.query(start_cycle=1, end_cycle=2, columns=["therm_L_C", "therm_R_C"], buckets=4)
+    assert result["source"] == "samples"
+    assert result["cycle_start"] == [1, 1, 2, 2]
+    assert result["cycle_end"] == [1, 1, 2, 2]
+    assert result["t_start"][0] == "2026-01-01T10:01:00.000000"
+    assert result["t_end"][-1] == "2026-01-01T10:02:01.500000"
+    assert result["therm_L_C"] == {
+        "min": [10.0, 12.0, 20.0, 22.0],
+        "max": [11.0, 13.0, 21.0, 23.0],
+        "mean": [10.5, 12.5, 20.5, 22.5],
+    }
+    assert result["therm_R_C"] == {
+        "min": [None, None, 21.0, 23.0],
+        "max": [None, None, 22.0, 24.0],
+        "mean": [None, None, 21.5, 23.5],
+    }
+    json.dumps(result, allow_nan=False)
+
+
+def test_sample_and_cycle_timestamps_match(store):
+    cycles = store.query(start_cycle=0, end_cycle=0, columns=["therm_L_C"], buckets=1)
+    samples = store.query(start_cycle=0, end_cycle=0, columns=["therm_L_C"], buckets=2)
+    raw = store.query(start_cycle=0, end_cycle=0, columns=["therm_L_C"])
+    assert cycles["source"] == "cycles"
+    assert samples["source"] == "samples"
+    assert cycles["t_start"] == samples["t_start"][:1] == raw["timestamp"][:1]
+    assert cycles["t_end"] == samples["t_end"][-1:] == raw["timestamp"][-1:]
+
+
+def test_query_time_window(store):
+    result = store.query(
+        start_time="2026-01-01 10:01:00.5",
+        end_time="2026-01-01T10:02:00.5",
+        columns=["therm_L_C"],
+    )
+    assert result["therm_L_C"] == [11.0, 12.0, 13.0, 20.0, 21.0]
+
+
+def test_query_empty_selection(store):
+    result = store.query(start_cycle=5, columns=["therm_L_C"], buckets=3)
+    assert result["t_start"] == []
+    assert result["therm_L_C"] == {"min": [], "max": [], "mean": []}
+    with pytest.raises(ValueError):
+        store.query(columns=["timestamp"])
@@ -0,0 +1,40 @@
+import logging
+import threading
+
+from app.persistence import PersistenceWorker
+
+
+def test_full_queue_blocks_and_keeps_order():
+    worker = PersistenceWorker(logging.getLogger("test"), queue_size=1, put_timeout_s=0.01)
+    worker.start()
+    release = threading.Event()
+    ran = []
+
+    def job(idx: int):
+        def run() -> None:
+            if idx == 0:
+                release.wait(5)
+            ran.append((idx, threading.current_thread().name))
+        return run
+
+    def submit_all() -> None:
+        for idx in range(4):
+            worker.submit(f"job_{idx}", job(idx))
+
+    submitter = threading.Thread(target=submit_all)
+    submitter.start()
+    submitter.join(0.5)
+    # Job 0 holds the worker and job 1 fills the queue, so job 2 is waiting for room
+    assert submitter.is_alive()
+    assert ran == []
+
+    release.set()
+    submitter.join(5)
+    worker.stop()
+    worker.join()
+
+    assert [idx for idx, _ in ran] == [0, 1, 2, 3]
+    assert {name for _, name in ran} == {"persistence"}
+    stats = worker.stats()
+    assert stats["completed"] == 4
+    assert stats["blocked"] >= 1
@@ -0,0 +1,81 @@
+import logging
+import os
+
+import pytest
+
+from hardware.cpc1706y import CPC1706Y
+from hardware.pwm import SysfsPWM
+
+
+def read(path: str) -> str:
+    with open(path) as f:
+        return f.read().strip()
+
+
+@pytest.fixture
+def chip(tmp_path):
+    os.makedirs(tmp_path / "pwmchip0")
+    return tmp_path
+
+
+def test_sysfs_export_and_period(chip):
+    SysfsPWM(str(chip), 0, 1, 50)
+    assert read(chip / "pwmchip0" / "export") == "1"
+    assert read(chip / "pwmchip0" / "pwm1" / "period") == "20000000"
+
+
+def test_sysfs_start_change_stop(chip):
+    pwm = SysfsPWM(str(chip), 0, 0, 50)
+    path = chip / "pwmchip0" / "pwm0"
+    pwm.start(0)
+    assert read(path / "enable") == "1"
+    assert read(path / "duty_cycle") == "0"
+    pwm.change_duty_cycle(25)
+    assert read(path / "duty_cycle") == "5000000"
+    pwm.stop()
+    assert read(path / "duty_cycle") == "0"
+    assert read(path / "enable") == "0"
+
+
+def test_sysfs_skips_export_when_channel_exists(chip):
+    os.makedirs(chip / "pwmchip0" / "pwm2")
+    SysfsPWM(str(chip), 0, 2, 100)
+    assert not (chip / "pwmchip0" / "export").exists()
+    assert read(chip / "pwmchip0" / "pwm2" / "period") == "10000000"
+
+
+def ssr(chip, resolution: float=1.0) -> CPC1706Y:
+    return CPC1706Y(
+        logging.getLogger("test"),
+        pin=0,
+        freq=50,
+        pwm=SysfsPWM(str(chip), 0, 0, 50),
+        resolution=resolution,
+    )
+
+
+def test_quantize_clamps(chip):
+    heater = ssr(chip, resolution=5.0)
+    assert heater.quantize(-12) == 0
+    assert heater.quantize(140) == 100
+    assert heater.quantize(42.4) == 40
+    assert heater.quantize(43) == 45
+
+
+def test_unchanged_duty_cycle_is_skipped(chip):
+    heater = ssr(chip, resolution=1.0)
+    duty_path = chip / "pwmchip0" / "pwm0" / "duty_cycle"
+
+    heater.set_duty_cycle(0.2)
+    assert heater.skipped == 1 and heater.updates == 0
+
+    heater.set_duty_cycle(30.4)
+    assert read(duty_path) == "6000000"
+    os.remove(duty_path)
+    heater.set_duty_cycle(29.6)
+    assert not duty_path.exists()
+    assert heater.stats() == {"duty_cycle": 30, "updates": 1, "skipped": 2}
+
+    heater.set_duty_cycle(31)
+    assert read(duty_path) == "6200000"
+    assert heater.updates == 2
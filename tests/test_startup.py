@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib")
+CLIENT_FORBIDDEN = ["pandas", "yaml", "numpy", "smbus2", "RPi", "Phidget22"]
+
+
+def loaded_modules(module: str) -> set:
+    out = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        env=dict(os.environ, PYTHONPATH=LIB),
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return {name.split(".")[0] for name in out.split()}
+
+
+def test_client_import_is_light():
+    pytest.importorskip("zmq")
+    loaded = loaded_modules("app_ipc.client")
+    assert not loaded & set(CLIENT_FORBIDDEN)
+
+
+def test_app_import_defers_pandas_and_hardware():
+    pytest.importorskip("zmq")
+    loaded = loaded_modules("app.app")
+    assert not loaded & {"pandas", "smbus2", "RPi", "Phidget22"}
@@ -0,0 +1,108 @@
+import logging
+
+import numpy as np
+import pytest
+
+from controllers.pid import PIDController
+from controllers.vector_pid import VectorPIDController
+
+
+CHANNELS = 4
+PERIOD_S = 0.2
+KP = [30.0, 10.0, 5.0, 1.0]
+KI = [5.0, 0.0, 1.0, 0.5]
+KD = [1.0, 2.0, 0.0, 0.1]
+
+logger = logging.getLogger("test_vector_pid")
+
+
+def scalar_pids(**kwargs):
+    return [
+        PIDController(logger, KP[ch], KI[ch], KD[ch], **kwargs)
+        for ch in range(CHANNELS)
+    ]
+
+
+def test_matches_scalar_pids():
+    kwargs = dict(output_limits=(0, 100), p_limits=(-50, 50), d_limits=(-20, 20))
+    scalars = scalar_pids(**kwargs)
+    vector = VectorPIDController(logger, CHANNELS, KP, KI, KD, **kwargs)
+    rng = np.random.default_rng(0)
+    setpoint = np.array([80.0, 60.0, 40.0, 100.0])
+
+    for tick in range(500):
+        values = rng.uniform(20, 90, CHANNELS)
+        t = tick * PERIOD_S
+        expected = [pid(values[ch], setpoint[ch], t) for ch, pid in enumerate(scalars)]
+        np.testing.assert_allclose(vector(values, setpoint, t), expected, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(
+        vector.integrated_error,
+        [pid.integrated_error for pid in scalars],
+        rtol=1e-12,
+    )
+
+
+def test_integrator_clamp():
+    # Only channel 0 has an i_limit; ki=2 puts its integrator ceiling at 10
+    vector = VectorPIDController(
+        logger, 2, kp=0.0, ki=2.0, kd=0.0,
+        output_limits=None,
+        i_limits=[(0.0, 20.0), None],
+    )
+    np.testing.assert_array_equal(vector.integral_limits, [[0.0, 10.0], [-np.inf, np.inf]])
+    setpoint = np.full(2, 100.0)
+    for tick in range(20):
+        out = vector(np.zeros(2), setpoint, tick * PERIOD_S)
+    assert vector.integrated_error[0] == 10.0
+    assert out[0] == 20.0
+    assert vector.integrated_error[1] == pytest.approx(19 * PERIOD_S * 100.0)
+    assert out[1] == 2.0 * vector.integrated_error[1]
+
+    # The clamped channel unwinds on the very next tick instead of paying back the excess
+    out = vector(np.full(2, 110.0), setpoint, 20 * PERIOD_S)
+    assert vector.integrated_error[0] == pytest.approx(10.0 - 10.0 * PERIOD_S)
+    assert out[0] < 20.0
+    assert out[1] > 20.0
+
+    vector.set_ki([4.0, 0.0])
+    np.testing.assert_array_equal(vector.integral_limits, [[0.0, 5.0], [-np.inf, np.inf]])
+
+
+def test_mask_and_nan_setpoint_hold_state():
+    kwargs = dict(output_limits=(0, 100))
+    scalars = scalar_pids(**kwargs)
+    vector = VectorPIDController(logger, CHANNELS, KP, KI, KD, **kwargs)
+    rng = np.random.default_rng(1)
+    last = np.zeros(CHANNELS)
+
+    for tick in range(200):
+        values = rng.uniform(20, 90, CHANNELS)
+        setpoint = np.full(CHANNELS, 70.0)
+        mask = rng.random(CHANNELS) < 0.7
+        # Channel 3 drops its setpoint now and then instead of being masked
+        mask[3] = True
+        if tick % 5 == 0:
+            setpoint[3] = np.nan
+        active = mask & (setpoint == setpoint)
+        t = tick * PERIOD_S
+
+        out = vector(values, setpoint, t, mask)
+        for ch, pid in enumerate(scalars):
+            # A held channel sees one longer dt when it comes back, like a scalar PID that skipped ticks
+            if active[ch]:
+                last[ch] = pid(values[ch], setpoint[ch], t)
+        np.testing.assert_allclose(out, last, rtol=1e-12, atol=1e-9)
+        np.testing.assert_array_equal(vector.output, out)
+
+
+def test_reset_mask():
+    vector = VectorPIDController(logger, 2, kp=1.0, ki=1.0, kd=0.0, output_limits=(0, 100))
+    for tick in range(3):
+        vector(np.zeros(2), np.full(2, 10.0), tick * PERIOD_S)
+    held = vector.integrated_error[1]
+    vector.reset(np.array([True, False]))
+    assert vector.integrated_error[0] == 0.0
+    assert np.isnan(vector.last_time[0])
+    assert vector.output[0] == 0.0
+    assert vector.integrated_error[1] == held
+    assert vector.last_time[1] == 2 * PERIOD_S